@@ -1,11 +1,129 @@
+from contextlib import contextmanager
 from heapq import heappush, heappop
+from itertools import islice
 from math import inf
 
+from batch import run_batch
+from compact import CompactGraph
+from cycles import PROGRESS_INTERVAL, strongly_connected_components, cyclic_components, simple_cycles, normalize_cycle
+from dynamic import IncrementalShortestPaths
+from journal import ChangeJournal
+from netlist import CHUNK_SIZE, NetlistReader
+from metrics import SearchStats, MetricsRegistry
+from nodal import EquivalentResistanceSolver
+from overlay import OverlayMap, shared_base
+from partition import partition_graph, write_shards
+from reachability import MAX_COMPONENTS, ReachabilityIndex
+from reduction import ReducedGraph
+from results import ShortestPath, CircuitPath, console_reporter
+from snapshot import save_snapshot, open_snapshot
+
+
+class SearchCancelled(Exception):
+    """由进度回调抛出，用于中止正在进行的搜索"""
+
+
+def _as_set(nodes):
+    """把可选的节点集合参数转换为 set，None 保持不变"""
+    if nodes is None or isinstance(nodes, (set, frozenset)):
+        return nodes
+    return set(nodes)
+
+
+def _as_edge_set(edges):
+    """把可选的 (起点, 终点) 序列转换为元组集合，None 保持不变"""
+    if edges is None:
+        return None
+    return {tuple(edge) for edge in edges}
+
+
+def _build_path(parents, end):
+    """沿父节点字典回溯，构建从源节点到 end 的路径"""
+    path = []
+    current = end
+    while current is not None:
+        path.append(current)
+        current = parents[current]
+    path.reverse()
+    return path
+
+
 class Graph:
-    def __init__(self):
+    def __init__(self, reporter=None):
+        """
+        参数:
+        reporter -- 可选的报告回调 reporter(事件名, 数据)，见 results 模块；
+                    为 None 时所有方法都不输出，只返回结果
+        """
         # 使用字典嵌套字典结构存储有向邻接表
         # 外层键为节点，内层键为邻接节点，值为电阻
         self.adj_list = {}
+        # 反向邻接表：外层键为节点，内层键为指向它的起点，值为电阻
+        # 与 adj_list 同步维护，使删除节点、查询入边只需 O(入度)
+        self.reverse_adj_list = {}
+        # 每次修改图结构时递增，派生索引据此判断缓存是否失效
+        self.version = 0
+        # 增量维护的最短路径树，调用 watch() 后创建
+        self._incremental = None
+        # 可达性索引，第一次调用 reachable() 等方法时构建
+        self._reachability = None
+        # 分量数超过索引上限时的图版本，图未修改期间不再尝试构建
+        self._reachability_too_large = None
+        self.reporter = reporter
+        # 运行统计，调用 enable_metrics() 后启用，见 metrics 模块
+        self.metrics = None
+        self.last_stats = None
+        # 修改日志与撤销/重做栈，见 journal 模块
+        self.journal = ChangeJournal()
+        self._batch_depth = 0
+        # 修改监听器，每个事务提交后调用一次
+        self.listeners = []
+        # 调用 fork() 之后邻接表变为写时复制的 OverlayMap，修改前需要先复制行
+        self._forked = False
+
+    def _report(self, event, data):
+        if self.reporter is not None:
+            self.reporter(event, data)
+
+    def enable_metrics(self, registry=None):
+        """
+        开启运行统计
+
+        参数:
+        registry -- 累计统计的 MetricsRegistry，可以在多个图之间共享；默认新建一个
+
+        返回:
+        使用的 MetricsRegistry
+        """
+        self.metrics = registry if registry is not None else MetricsRegistry()
+        return self.metrics
+
+    def disable_metrics(self):
+        self.metrics = None
+
+    def _begin_stats(self, operation):
+        """统计开启时返回新的 SearchStats，否则返回 None"""
+        if self.metrics is None:
+            return None
+        return SearchStats(operation)
+
+    def _end_stats(self, stats):
+        stats.finish()
+        self.last_stats = stats
+        if self.metrics is not None:
+            self.metrics.record(stats)
+
+    def _finish_when_done(self, iterator, stats, source):
+        """
+        包装迭代器，在迭代结束或被提前关闭时结束统计
+
+        source 为底层的搜索生成器，先关闭它，使其在 finally 中写入的计数被包含在内。
+        """
+        try:
+            yield from iterator
+        finally:
+            source.close()
+            self._end_stats(stats)
 
     def parse_input(self):
         """解析用户输入，构建有向邻接表"""
@@ -27,40 +145,533 @@ class Graph:
         except Exception as e:
             print(f"发生异常：{e}")
 
+    @classmethod
+    def from_edges(cls, edges, reporter=None):
+        """从 (起点, 终点, 电阻值) 序列批量构建图，构建过程不记入修改日志"""
+        graph = cls(reporter)
+        graph._add_edges(edges, record=False)
+        return graph
+
+    @classmethod
+    def load(cls, source, chunk_size=CHUNK_SIZE, reporter=None):
+        """
+        从网表文件流式加载图
+
+        参数:
+        source -- 文件路径或文件对象，格式见 netlist 模块
+        chunk_size -- 每次读取的字符数
+        reporter -- 新图的报告回调
+
+        返回:
+        新的 Graph，加载过程不记入修改日志；格式错误的行被跳过，汇总后以 load_errors 事件报告一次
+        """
+        reader = NetlistReader(source, chunk_size)
+        graph = cls(reporter)
+        graph._add_edges(reader, record=False)
+        if reader.error_count:
+            graph._report("load_errors", reader.error_summary())
+        return graph
+
+    @contextmanager
+    def batch(self):
+        """
+        把多次编辑合并为一个事务
+
+        with graph.batch():
+            graph.add_edge("A", "B", 10)
+            graph.delete_node("C")
+
+        退出时整个事务作为一步记入修改日志，可以一次撤销；监听器只被通知一次。
+        with 块中抛出异常时，块内的所有编辑按逆序回滚，图恢复原状后异常继续向外抛出。
+        可以嵌套，内层的编辑属于外层事务。
+        """
+        begin = len(self.journal)
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._rollback(begin)
+            raise
+        finally:
+            self._batch_depth -= 1
+        self._commit(begin)
+
+    def _commit(self, begin):
+        """提交 begin 之后的日志记录；处在 batch() 中时留给最外层提交"""
+        if self._batch_depth:
+            return
+        changes = self.journal.commit(begin)
+        if changes:
+            self._trim_history()
+            self._notify(changes)
+
+    def _rollback(self, begin):
+        """按逆序撤销 begin 之后尚未提交的修改，并丢弃这些记录"""
+        for record in self.journal.segment((begin, len(self.journal))):
+            self._revert(record)
+        self.journal.truncate(begin)
+
+    def _revert(self, record):
+        """应用一条日志记录的逆操作，逆操作本身同样记入日志"""
+        op = record[0]
+        if op == "node+":
+            self._remove_node(record[1])
+        elif op == "edge":
+            _, start, end, old, _ = record
+            if old is None:
+                self._remove_edge(start, end)
+            else:
+                self._set_edge(start, end, old)
+        elif op == "edge-":
+            _, start, end, resistance = record
+            self._set_edge(start, end, resistance)
+        elif op == "node-":
+            _, node, outgoing, incoming = record
+            self._add_node(node)
+            for successor, resistance in outgoing.items():
+                self._set_edge(node, successor, resistance)
+            for predecessor, resistance in incoming.items():
+                self._set_edge(predecessor, node, resistance)
+        else:
+            self._revert_bulk(record)
+
+    def _revert_bulk(self, record):
+        """
+        撤销或重做一次批量添加
+
+        借用基本修改逐条完成（分支的行复制、增量最短路径的通知都由它们处理），
+        随后把它们逐条写入的日志换成一条同样紧凑的逆记录。
+        """
+        op, nodes, starts, ends, resistances, old = record
+        mark = len(self.journal)
+        if op == "edges+":
+            for i in range(len(starts) - 1, -1, -1):
+                if i in old:
+                    self._set_edge(starts[i], ends[i], old[i])
+                else:
+                    self._remove_edge(starts[i], ends[i])
+            for node in reversed(nodes):
+                self._remove_node(node)
+            inverse = "edges-"
+        else:
+            for node in nodes:
+                self._add_node(node)
+            for start, end, resistance in zip(starts, ends, resistances):
+                self._set_edge(start, end, resistance)
+            inverse = "edges+"
+        self.journal.truncate(mark)
+        self.journal.append((inverse, nodes, starts, ends, resistances, old))
+
+    def undo(self):
+        """撤销最近一个事务，返回是否有可撤销的事务"""
+        return self._replay(self.journal.undo_stack, self.journal.redo_stack)
+
+    def redo(self):
+        """重做最近一次撤销的事务，返回是否有可重做的事务"""
+        return self._replay(self.journal.redo_stack, self.journal.undo_stack)
+
+    def _replay(self, source, target):
+        """对 source 栈顶的事务应用逆操作，逆操作形成的事务压入 target 栈"""
+        if self._batch_depth:
+            raise RuntimeError("批量修改进行中，不能撤销或重做")
+        if not source:
+            return False
+        span = source.pop()
+        begin = len(self.journal)
+        for record in self.journal.segment(span):
+            self._revert(record)
+        target.append((begin, len(self.journal)))
+        changes = self.journal.records[begin:]
+        self._trim_history()
+        self._notify(changes)
+        return True
+
+    def can_undo(self):
+        return bool(self.journal.undo_stack)
+
+    def can_redo(self):
+        return bool(self.journal.redo_stack)
+
+    def clear_history(self):
+        """清空修改日志，释放其占用的内存；之后无法撤销此前的修改"""
+        if self._batch_depth:
+            raise RuntimeError("批量修改进行中，不能清空修改日志")
+        self.journal.clear()
+
+    def set_history_limit(self, max_transactions):
+        """
+        限制可撤销的事务数，超出时丢弃最早的事务及其日志记录
+
+        参数:
+        max_transactions -- 最多保留的事务数，None 表示不限（默认）
+        """
+        if self._batch_depth:
+            raise RuntimeError("批量修改进行中，不能修改撤销历史的上限")
+        self.journal.max_transactions = max_transactions
+        self._trim_history()
+
+    def _trim_history(self):
+        if self.journal.max_transactions is not None:
+            self.journal.trim()
+
+    def add_listener(self, listener):
+        """
+        注册修改监听器
+
+        参数:
+        listener -- listener(记录列表)，每个事务提交、撤销或重做后调用一次，
+                    参数为这次修改追加的日志记录，格式见 journal 模块
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, changes):
+        for listener in self.listeners:
+            listener(changes)
+
+    def fork(self):
+        """
+        返回一个写时复制的分支，用于假设分析（例如"R7 加倍会怎样"）
+
+        分支与当前图共享所有未修改的邻接行，各自的修改只复制被修改的行，互不影响；
+        所有查询在分支上照常使用。分支有独立的修改日志和空的撤销栈，
+        不继承报告回调、监听器、关注的源节点和统计设置。
+
+        返回:
+        新的 Graph
+        """
+        if self._batch_depth:
+            raise RuntimeError("批量修改进行中，不能创建分支")
+        # 当前的邻接表冻结为共享的只读层，父图和分支各自在上面叠加一层
+        adj_base = shared_base(self.adj_list)
+        reverse_base = shared_base(self.reverse_adj_list)
+        self.adj_list = OverlayMap(adj_base)
+        self.reverse_adj_list = OverlayMap(reverse_base)
+        self._forked = True
+
+        child = type(self)()
+        child.adj_list = OverlayMap(adj_base)
+        child.reverse_adj_list = OverlayMap(reverse_base)
+        child._forked = True
+        child.version = self.version
+        return child
+
+    def add_edges(self, edges):
+        """
+        批量添加有向边，不逐条输出；整批作为一个事务记入修改日志
+
+        参数:
+        edges -- 可迭代的 (起点, 终点, 电阻值) 序列，可以是生成器
+
+        返回:
+        添加的边数
+        """
+        begin = len(self.journal)
+        try:
+            count = self._add_edges(edges, record=True)
+        except BaseException:
+            # 生成器中途出错时不留下半批边
+            self._rollback(begin)
+            raise
+        self._commit(begin)
+        return count
+
+    def _add_edges(self, edges, record):
+        """
+        批量添加边；record 为 False 时不写修改日志（用于构建新图）
+
+        record 为 True 时整批只写一条 "edges+" 记录：新节点、各边的起点、终点和
+        电阻值分别存成列表，被覆盖的旧电阻值按边的序号存入字典。记录在添加之前
+        写入，中途出错时回滚同样只需这一条。
+        """
+        if self._incremental is not None or self._forked:
+            # 存在被关注的源节点时逐条通知；分支需要逐行复制
+            count = 0
+            for start, end, resistance in edges:
+                self._set_edge(start, end, float(resistance))
+                count += 1
+            return count
+
+        adj_list = self.adj_list
+        reverse_adj_list = self.reverse_adj_list
+        count = 0
+        if not record:
+            for start, end, resistance in edges:
+                row = adj_list.get(start)
+                if row is None:
+                    row = adj_list[start] = {}
+                    reverse_adj_list[start] = {}
+                if end not in adj_list:
+                    adj_list[end] = {}
+                    reverse_adj_list[end] = {}
+                resistance = float(resistance)
+                row[end] = resistance
+                reverse_adj_list[end][start] = resistance
+                count += 1
+            self.version += 1
+            return count
+
+        nodes, starts, ends, resistances, old = [], [], [], [], {}
+        self.journal.append(("edges+", nodes, starts, ends, resistances, old))
+        try:
+            for start, end, resistance in edges:
+                row = adj_list.get(start)
+                if row is None:
+                    row = adj_list[start] = {}
+                    reverse_adj_list[start] = {}
+                    nodes.append(start)
+                if end not in adj_list:
+                    adj_list[end] = {}
+                    reverse_adj_list[end] = {}
+                    nodes.append(end)
+                resistance = float(resistance)
+                previous = row.get(end)
+                if previous is not None:
+                    old[count] = previous
+                starts.append(start)
+                ends.append(end)
+                resistances.append(resistance)
+                row[end] = resistance
+                reverse_adj_list[end][start] = resistance
+                count += 1
+        finally:
+            self.version += 1
+        if not count:
+            # 空批次不留下记录，也就不产生事务
+            self.journal.truncate(len(self.journal) - 1)
+        return count
+
     def add_node(self, node):
         """添加节点，如果节点不存在则初始化"""
+        begin = len(self.journal)
+        self._add_node(node)
+        self._commit(begin)
+
+    def _add_node(self, node):
         if node not in self.adj_list:
             self.adj_list[node] = {}
+            self.reverse_adj_list[node] = {}
+            self.journal.append(("node+", node))
+            self.version += 1
+            if self._incremental is not None:
+                self._incremental.node_added(node)
 
     def add_edge(self, start, end, resistance):
         """添加有向边，仅存储单向关系"""
+        begin = len(self.journal)
+        self._set_edge(start, end, resistance)
+        self._commit(begin)
+        self._report("edge_added", (start, end, resistance))
+
+    def _set_edge(self, start, end, resistance):
+        """添加或更新一条边，不输出信息"""
         # 添加起点和终点节点（如果不存在）
-        self.add_node(start)
-        self.add_node(end)
+        self._add_node(start)
+        self._add_node(end)
+        if self._forked:
+            self.adj_list.own(start)
+            self.reverse_adj_list.own(end)
         # 有向边：仅从 start 到 end
+        old = self.adj_list[start].get(end)
         self.adj_list[start][end] = resistance
-        print(f"添加边：{start} → {end}，电阻值：{resistance}Ω")
+        self.reverse_adj_list[end][start] = resistance
+        self.journal.append(("edge", start, end, old, resistance))
+        self.version += 1
+        if self._incremental is not None:
+            self._incremental.edge_set(start, end, old, resistance)
 
     def delete_node(self, node):
-        """删除节点及其所有出边和入边"""
-        if node in self.adj_list:
-            # 删除所有指向该节点的入边
-            for n in list(self.adj_list.keys()):
-                if node in self.adj_list[n]:
-                    del self.adj_list[n][node]
-            # 删除节点及其出边
-            del self.adj_list[node]
-            print(f"删除节点：{node}")
-        else:
-            print(f"节点 {node} 不存在")
+        """删除节点及其所有出边和入边，返回节点是否存在"""
+        begin = len(self.journal)
+        if self._remove_node(node):
+            self._commit(begin)
+            self._report("node_deleted", node)
+            return True
+        self._report("node_missing", node)
+        return False
+
+    def delete_nodes(self, nodes):
+        """
+        批量删除节点及其所有出边和入边，只报告一次汇总
+
+        参数:
+        nodes -- 可迭代的节点序列，不存在的节点被忽略
+
+        返回:
+        实际删除的节点数
+        """
+        begin = len(self.journal)
+        count = 0
+        for node in nodes:
+            if self._remove_node(node):
+                count += 1
+        self._commit(begin)
+        self._report("nodes_deleted", count)
+        return count
+
+    def _remove_node(self, node):
+        """删除节点，代价为 O(入度 + 出度)；节点不存在时返回 False"""
+        if node not in self.adj_list:
+            return False
+        if self._forked:
+            for predecessor in self.reverse_adj_list[node]:
+                self.adj_list.own(predecessor)
+            for successor in self.adj_list[node]:
+                self.reverse_adj_list.own(successor)
+        # 删除所有指向该节点的入边（自环在这里一并删除，只记录在 incoming 中）
+        incoming = self.reverse_adj_list.pop(node)
+        for predecessor in incoming:
+            del self.adj_list[predecessor][node]
+        # 删除节点及其出边
+        outgoing = self.adj_list.pop(node)
+        for successor in outgoing:
+            del self.reverse_adj_list[successor][node]
+        # 被删除的字典直接保存在日志中，撤销时按原样恢复
+        self.journal.append(("node-", node, outgoing, incoming))
+        self.version += 1
+        if self._incremental is not None:
+            self._incremental.node_removed(node)
+        return True
 
     def delete_edge(self, start, end):
-        """删除指定有向边"""
-        if start in self.adj_list and end in self.adj_list[start]:
-            del self.adj_list[start][end]
-            print(f"删除边：{start} → {end}")
-        else:
-            print(f"边 {start} → {end} 不存在")
+        """删除指定有向边，返回边是否存在"""
+        begin = len(self.journal)
+        if self._remove_edge(start, end):
+            self._commit(begin)
+            self._report("edge_deleted", (start, end))
+            return True
+        self._report("edge_missing", (start, end))
+        return False
+
+    def _remove_edge(self, start, end):
+        """删除一条边，不输出信息；边不存在时返回 False"""
+        row = self.adj_list.get(start)
+        if row is None or end not in row:
+            return False
+        if self._forked:
+            row = self.adj_list.own(start)
+            self.reverse_adj_list.own(end)
+        resistance = row.pop(end)
+        del self.reverse_adj_list[end][start]
+        self.journal.append(("edge-", start, end, resistance))
+        self.version += 1
+        if self._incremental is not None:
+            self._incremental.edge_removed(start, end)
+        return True
+
+    def predecessors(self, node):
+        """返回所有指向 node 的起点列表，节点不存在时返回空列表"""
+        return list(self.reverse_adj_list.get(node, ()))
+
+    def in_degree(self, node):
+        """返回节点的入边数"""
+        return len(self.reverse_adj_list.get(node, ()))
+
+    def out_degree(self, node):
+        """返回节点的出边数"""
+        return len(self.adj_list.get(node, ()))
+
+    def equivalent_resistance(self, a, b, progress=None):
+        """
+        用节点分析法计算 a、b 两点间的等效电阻（包括并联支路），见 nodal 模块
+
+        参数:
+        progress -- 可选的进度回调，抛出异常即可中止计算，见 EquivalentResistanceSolver
+
+        返回:
+        等效电阻值；两点不连通时为 inf；节点不存在时返回 None
+        """
+        if a not in self.adj_list or b not in self.adj_list:
+            return None
+        return EquivalentResistanceSolver(self, progress=progress).resistance(a, b)
+
+    def equivalent_resistances(self, pairs):
+        """
+        批量计算多个节点对的等效电阻，只建立并分解一次导纳矩阵
+
+        参数:
+        pairs -- 可迭代的 (a, b) 序列
+
+        返回:
+        与输入顺序一致的列表，节点不存在的项为 None
+        """
+        pairs = list(pairs)
+        solver = EquivalentResistanceSolver(self)
+        valid = [i for i, (a, b) in enumerate(pairs) if a in self.adj_list and b in self.adj_list]
+        results = [None] * len(pairs)
+        for i, value in zip(valid, solver.resistances(pairs[i] for i in valid)):
+            results[i] = value
+        return results
+
+    def compile(self):
+        """
+        构建紧凑的只读 CSR 表示（见 compact.CompactGraph）
+
+        大图上的批量分析应在编译结果上运行；图被修改后需要重新编译。
+        """
+        return CompactGraph.from_graph(self)
+
+    def run_batch(self, queries, workers=None, chunksize=1):
+        """
+        在多个进程中并行执行一批查询（见 batch 模块）
+
+        图被编译并写成一次快照，各进程以 mmap 方式共享，不会为每个任务序列化整个图。
+
+        参数:
+        queries -- 查询元组序列，例如 ("shortest_path", "A", "B")
+        workers -- 工作进程数，默认为 CPU 核数
+        chunksize -- 每个任务包含的查询数
+
+        返回:
+        生成器，按完成顺序产生 (序号, 查询, 结果)
+        """
+        return run_batch(self.compile(), queries, workers, chunksize)
+
+    def reduce(self, keep=()):
+        """
+        串联、并联化简，见 reduction 模块
+
+        参数:
+        keep -- 必须保留的节点，例如之后要查询的起点和终点
+
+        返回:
+        ReducedGraph；其 iter_paths、all_paths_simulation、shortest_path、
+        detect_cycles 在化简图上运行，结果展开为原图中的节点
+        """
+        return ReducedGraph(self, keep)
+
+    def partition(self, k, seed=0):
+        """把图划分为 k 个规模接近、割边较少的部分，返回 {节点: 部分编号}，见 partition 模块"""
+        return partition_graph(self, k, seed=seed)
+
+    def write_shards(self, directory, k):
+        """
+        划分图并写成分片目录，之后可用 partition.ShardedGraph 跨分片分析
+
+        返回:
+        清单文件路径
+        """
+        return write_shards(self, directory, k)
+
+    def save_snapshot(self, path):
+        """把当前图保存为二进制快照（格式见 snapshot 模块）"""
+        save_snapshot(self.compile(), path)
+
+    @staticmethod
+    def open_snapshot(path, mmap=True):
+        """
+        打开二进制快照
+
+        参数:
+        path -- 快照文件路径
+        mmap -- 是否以只读内存映射方式打开，多个进程可共享同一份页缓存
+
+        返回:
+        只读的 CompactGraph，需要编辑时调用其 to_graph()
+        """
+        return open_snapshot(path, use_mmap=mmap)
 
     def display_graph(self):
         """显示当前邻接表内容"""
@@ -72,205 +683,779 @@ class Graph:
             connections = self.adj_list[node]
             print(f"{node}: {connections}")
 
-    def detect_cycles(self):
+    def strongly_connected_components(self):
+        """计算所有强连通分量（迭代 Tarjan，O(V+E)），返回节点列表的列表"""
+        return list(strongly_connected_components(self.adj_list))
+
+    def cycle_nodes(self):
+        """返回位于某个非法环路上的所有节点集合，O(V+E)"""
+        nodes = set()
+        for component in cyclic_components(self.adj_list):
+            nodes.update(component)
+        return nodes
+
+    def has_cycles(self):
+        """判断图中是否存在非法环路（包括自环），O(V+E)"""
+        return bool(cyclic_components(self.adj_list))
+
+    def iter_cycles(self, max_cycles=None, max_length=None, progress=None):
+        """
+        逐个产生图中的基本环路（Johnson 算法）
+
+        参数:
+        max_cycles -- 最多产生的环路数，None 表示不限
+        max_length -- 环路最多包含的节点数，None 表示不限
+        progress -- 进度回调，含义同 iter_paths
+
+        返回:
+        迭代器，每个环路为标准化后的节点元组，例如 (A, B, C, A)
+        """
+        stats = self._begin_stats("iter_cycles")
+        search = simple_cycles(self.adj_list, max_length, progress, stats)
+        cycles = search if max_cycles is None else islice(search, max_cycles)
+        cycles = map(normalize_cycle, cycles)
+        if stats is None:
+            return cycles
+        return self._finish_when_done(cycles, stats, search)
+
+    def detect_cycles(self, max_cycles=None, max_length=None):
         """检测图中的所有非法环路（包括自环和多节点环路）"""
-        cycles = set()  # 存储检测到的环路
-
-        # 对每个节点执行DFS
-        for start_node in self.adj_list:
-            # 当前DFS路径中的节点
-            stack = []
-            # 标记当前DFS路径中的节点
-            on_stack = set()
-
-            def dfs(node):
-                # 如果节点已在当前路径中，找到环路
-                if node in on_stack:
-                    # 找到环路的起点位置
-                    start_idx = stack.index(node)
-                    # 获取环路节点
-                    cycle_nodes = stack[start_idx:] + [node]
-
-                    # 标准化环路表示，使相同环路具有相同表示
-                    # 1. 找到环路中字典序最小的节点
-                    min_node_idx = 0
-                    min_node = cycle_nodes[0]
-                    for i, n in enumerate(cycle_nodes[:-1]):  # 最后一个节点是重复的，排除
-                        if n < min_node:
-                            min_node = n
-                            min_node_idx = i
-
-                    # 2. 从最小节点开始重新排列环路
-                    normalized_cycle = tuple(cycle_nodes[min_node_idx:-1] +
-                                             cycle_nodes[:min_node_idx] +
-                                             [cycle_nodes[min_node_idx]])
-
-                    # 添加标准化后的环路
-                    cycles.add(normalized_cycle)
-                    return
-
-                # 将节点加入当前路径
+        cycles = set(self.iter_cycles(max_cycles, max_length))
+        self._report("cycles", cycles)
+        return cycles
+
+    def reachability_index(self, max_components=MAX_COMPONENTS):
+        """
+        返回可达性索引（见 reachability 模块）
+
+        图未修改时复用上次构建的索引。索引存在且有效时，路径搜索会用它
+        提前排除不可达的查询，并代替每次查询时的反向遍历来剪枝。
+        强连通分量数超过 max_components 时抛出 ValueError；reachable() 等方法
+        遇到这种情况会改用逐次遍历，不会抛出异常。
+        """
+        index = self._reachability
+        if index is None or index.version != self.version:
+            index = self._reachability = ReachabilityIndex(self, max_components)
+        return index
+
+    def _current_reachability(self):
+        """返回仍然有效的可达性索引，没有时返回 None（不会为此构建索引）"""
+        index = self._reachability
+        if index is not None and index.version == self.version:
+            return index
+        return None
+
+    def _reachability_or_none(self):
+        """构建或复用可达性索引；分量数超过上限时返回 None"""
+        if self._reachability_too_large == self.version:
+            return None
+        try:
+            return self.reachability_index()
+        except ValueError:
+            self._reachability_too_large = self.version
+            return None
+
+    def reachable(self, a, b):
+        """
+        判断 a 能否到达 b，节点不存在时返回 False；第一次调用或图修改后先构建索引
+
+        强连通分量数超过索引上限（见 reachability.MAX_COMPONENTS）时不构建索引，
+        改为每次查询从 a 出发遍历，到达 b 即停止。
+        """
+        index = self._reachability_or_none()
+        if index is not None:
+            return index.reachable(a, b)
+        if a not in self.adj_list or b not in self.adj_list:
+            return False
+        return a == b or b in self._nodes_reachable(a, stop=b)
+
+    def reachable_from(self, a):
+        """返回从 a 出发能到达的所有节点集合（含 a 本身）；索引不可用时同样改为遍历"""
+        index = self._reachability_or_none()
+        if index is not None:
+            return index.reachable_from(a)
+        if a not in self.adj_list:
+            return set()
+        return self._nodes_reachable(a)
+
+    def _nodes_reachable(self, source, stop=None):
+        """返回从 source 出发能到达的节点集合（含 source 本身）；到达 stop 时提前结束"""
+        adj_list = self.adj_list
+        reached = {source}
+        stack = [source]
+        while stack:
+            for node in adj_list[stack.pop()]:
+                if node not in reached:
+                    if node == stop:
+                        reached.add(node)
+                        return reached
+                    reached.add(node)
+                    stack.append(node)
+        return reached
+
+    def _nodes_reaching(self, target, avoid_nodes=None, avoid_edges=None):
+        """返回所有能到达 target 的节点集合（含 target 本身），不经过被排除的节点和边"""
+        reverse_adj_list = self.reverse_adj_list
+        reached = {target}
+        stack = [target]
+        while stack:
+            current = stack.pop()
+            for node in reverse_adj_list[current]:
+                if node in reached:
+                    continue
+                if avoid_nodes and node in avoid_nodes:
+                    continue
+                if avoid_edges and (node, current) in avoid_edges:
+                    continue
+                reached.add(node)
                 stack.append(node)
-                on_stack.add(node)
-
-                # 探索所有邻居
-                for neighbor in self.adj_list.get(node, {}):
-                    if neighbor == node:
-                        # 处理自环
-                        cycles.add((node, node))
-                    else:
-                        dfs(neighbor)
-
-                # 回溯：从当前路径中移除节点
-                stack.pop()
-                on_stack.remove(node)
-
-            # 从当前起点执行DFS
-            dfs(start_node)
-
-        # 输出结果
-        if cycles:
-            print("检测到以下非法环路：")
-            for cycle in cycles:
-                print(" → ".join(cycle))
-        else:
-            print("未检测到非法环路")
+        return reached
 
-        return cycles
+    def iter_paths(self, start_node, end_node, max_paths=None, max_resistance=None, max_depth=None,
+                   prune_unreachable=True, progress=None, avoid_nodes=None, avoid_edges=None, via_nodes=None):
+        """
+        逐条产生从起点到终点的简单路径及总电阻值
+
+        使用迭代回溯，内存占用只与当前路径长度有关，调用方可以随时停止迭代。
+        电阻值应为非负数，否则按 max_resistance 剪枝可能漏掉路径。
+
+        参数:
+        start_node -- 起始节点
+        end_node -- 目标节点
+        max_paths -- 最多产生的路径数，None 表示不限
+        max_resistance -- 总电阻上限，部分路径电阻已超过上限的分支直接剪掉
+        max_depth -- 路径最多包含的边数
+        prune_unreachable -- 预先计算能到达终点的节点，跳过无法到达终点的邻居
+        progress -- 进度回调，每扩展 PROGRESS_INTERVAL 个节点以已扩展节点数调用一次；
+                    回调中抛出 SearchCancelled 可以中止搜索
+        avoid_nodes -- 路径不能经过的节点集合
+        avoid_edges -- 路径不能使用的 (起点, 终点) 边集合
+        via_nodes -- 路径必须依次经过的节点序列
+
+        以上约束都在搜索过程中剪枝，而不是先枚举全部路径再过滤。
+
+        返回:
+        迭代器，每次产生 CircuitPath(路径, 总电阻值)
+        """
+        stats = self._begin_stats("iter_paths")
+        paths = self._iter_paths(start_node, end_node, max_paths, max_resistance, max_depth,
+                                 prune_unreachable, progress, stats,
+                                 _as_set(avoid_nodes), _as_edge_set(avoid_edges), via_nodes)
+        if stats is None:
+            return paths
+        return self._finish_when_done(paths, stats, paths)
+
+    def _iter_paths(self, start_node, end_node, max_paths, max_resistance, max_depth,
+                    prune_unreachable, progress, stats, avoid_nodes, avoid_edges, via_nodes):
+        """iter_paths 的实现，stats 不为 None 时在结束时写入计数"""
+        adj_list = self.adj_list
+        if start_node not in adj_list or end_node not in adj_list:
+            return
+        if avoid_nodes and (start_node in avoid_nodes or end_node in avoid_nodes):
+            return
+
+        # 必经节点：起点、终点本身不需要再经过；via_index 记录每个必经节点的次序
+        via = list(via_nodes or ())
+        if via and via[0] == start_node:
+            via.pop(0)
+        if via and via[-1] == end_node:
+            via.pop()
+        via_index = {node: i for i, node in enumerate(via)}
+        if len(via_index) != len(via) or start_node in via_index or end_node in via_index:
+            return
+        if avoid_nodes and not avoid_nodes.isdisjoint(via_index):
+            return
+
+        if start_node == end_node:
+            if not via:
+                if stats is not None:
+                    stats.paths_found += 1
+                yield CircuitPath([start_node], 0)
+            return
+        if max_paths is not None and max_paths <= 0:
+            return
+
+        index = self._current_reachability()
+        if index is not None and not index.reachable(start_node, end_node):
+            return
+
+        reachable = None
+        if prune_unreachable:
+            if index is not None and not avoid_nodes and not avoid_edges:
+                find_reaching = lambda: index.nodes_reaching(end_node)
+            else:
+                find_reaching = lambda: self._nodes_reaching(end_node, avoid_nodes, avoid_edges)
+            if stats is None:
+                reachable = find_reaching()
+            else:
+                with stats.phase("reachability"):
+                    reachable = find_reaching()
+        if reachable is not None and start_node not in reachable:
+            return
+
+        # 被排除的边按起点分组，只在扩展这些起点时过滤，其余节点不增加开销
+        blocked_out = {}
+        for a, b in avoid_edges or ():
+            blocked_out.setdefault(a, set()).add(b)
+
+        def filtered(node):
+            edges = adj_list[node].items()
+            blocked = blocked_out.get(node)
+            if blocked is None:
+                return iter(edges)
+            return iter([(n, r) for n, r in edges if n not in blocked])
+
+        successors = filtered if blocked_out else None
+
+        count = 0
+        expanded = 0
+        pruned = 0
+        deepest = 0
+        next_via = 0
+        current_path = [start_node]
+        # 被排除的节点视为已在路径上，搜索中自然不会进入
+        on_path = {start_node}
+        if avoid_nodes:
+            on_path.update(avoid_nodes)
+        sums = [0]
+        stack = [iter(adj_list[start_node].items()) if successors is None else successors(start_node)]
+
+        try:
+            while stack:
+                for neighbor, resistance in stack[-1]:
+                    # 剪枝：避免循环路径
+                    if neighbor in on_path:
+                        pruned += 1
+                        continue
+                    resistance_sum = sums[-1] + resistance
+                    # 剪枝：电阻或深度超过上限
+                    if max_resistance is not None and resistance_sum > max_resistance:
+                        pruned += 1
+                        continue
+                    if max_depth is not None and len(current_path) > max_depth:
+                        pruned += 1
+                        continue
+
+                    # 到达终点
+                    if neighbor == end_node:
+                        if next_via < len(via):
+                            pruned += 1
+                            continue
+                        # 先计数再产生：调用方在 yield 处关闭生成器时这条路径也计入统计
+                        count += 1
+                        yield CircuitPath(current_path + [end_node], resistance_sum)
+                        if max_paths is not None and count >= max_paths:
+                            return
+                        continue
+
+                    # 剪枝：该邻居无法到达终点
+                    if reachable is not None and neighbor not in reachable:
+                        pruned += 1
+                        continue
+
+                    # 剪枝：必须按顺序经过必经节点
+                    if via_index:
+                        position = via_index.get(neighbor)
+                        if position is not None:
+                            if position != next_via:
+                                pruned += 1
+                                continue
+                            next_via += 1
 
-    def all_paths_simulation(self, start_node, end_node):
+                    current_path.append(neighbor)
+                    on_path.add(neighbor)
+                    sums.append(resistance_sum)
+                    stack.append(iter(adj_list[neighbor].items()) if successors is None else successors(neighbor))
+                    expanded += 1
+                    if len(stack) > deepest:
+                        deepest = len(stack)
+                    if progress is not None and not expanded % PROGRESS_INTERVAL:
+                        progress(expanded)
+                    break
+                else:
+                    # 回溯：当前节点的邻居已全部探索
+                    stack.pop()
+                    node = current_path.pop()
+                    on_path.discard(node)
+                    if node in via_index:
+                        next_via -= 1
+                    sums.pop()
+        finally:
+            if stats is not None:
+                stats.nodes_expanded += expanded
+                stats.paths_found += count
+                stats.paths_pruned += pruned
+                stats.max_depth = max(stats.max_depth, deepest)
+
+    def all_paths_simulation(self, start_node, end_node, max_paths=None, max_resistance=None, max_depth=None,
+                             avoid_nodes=None, avoid_edges=None, via_nodes=None):
         """
         计算从起点到终点的所有可能路径及总电阻值
 
         参数:
         start_node -- 起始节点
         end_node -- 目标节点
+        max_paths, max_resistance, max_depth -- 搜索限制，含义同 iter_paths
+        avoid_nodes, avoid_edges, via_nodes -- 路径约束，含义同 iter_paths
 
         返回:
-        路径列表，每个元素为(路径, 总电阻值)的元组
+        CircuitPath(路径, 总电阻值) 列表
         """
         if start_node not in self.adj_list or end_node not in self.adj_list:
-            print(f"错误：节点 {start_node} 或 {end_node} 不存在")
+            self._report("nodes_missing", (start_node, end_node))
             return []
 
-        all_paths = []
-        current_path = [start_node]
-        visited = {node: False for node in self.adj_list}
-
-        def backtrack(node, resistance_sum):
-            # 到达终点
-            if node == end_node:
-                all_paths.append((current_path.copy(), resistance_sum))
-                return
-
-            # 标记当前节点为已访问
-            visited[node] = True
-
-            # 探索所有邻接节点
-            for neighbor, resistance in self.adj_list.get(node, {}).items():
-                # 剪枝：避免循环路径
-                if not visited[neighbor]:
-                    # 添加节点到路径
-                    current_path.append(neighbor)
-                    # 递归探索
-                    backtrack(neighbor, resistance_sum + resistance)
-                    # 回溯：移除节点
-                    current_path.pop()
-
-            # 回溯：将节点标记为未访问，允许其在其他路径中使用
-            visited[node] = False
-
-        # 开始回溯搜索
-        backtrack(start_node, 0)
-
-        # 输出结果
-        if all_paths:
-            print(f"从 {start_node} 到 {end_node} 的所有可能路径:")
-            for path, resistance in all_paths:
-                path_str = " → ".join(path)
-                print(f"{path_str} ({resistance}Ω)")
-        else:
-            print(f"没有找到从 {start_node} 到 {end_node} 的路径")
-
+        all_paths = list(self.iter_paths(start_node, end_node, max_paths, max_resistance, max_depth,
+                                         avoid_nodes=avoid_nodes, avoid_edges=avoid_edges, via_nodes=via_nodes))
+        self._report("paths", (start_node, end_node, all_paths))
         return all_paths
 
-    def shortest_path(self, start, end):
+    def watch(self, source):
         """
-        使用 Dijkstra 算法计算两点电阻最小的路径
+        关注一个源节点，此后图的每次修改都会增量更新它的最短路径树
+
+        以该节点为起点的 shortest_path 查询直接从树中读取结果。
+
+        返回:
+        dynamic.ShortestPathTree
+        """
+        if self._incremental is None:
+            self._incremental = IncrementalShortestPaths(self)
+        return self._incremental.watch(source)
+
+    def unwatch(self, source):
+        """取消关注源节点；没有被关注的节点时不再维护任何增量信息"""
+        if self._incremental is not None:
+            self._incremental.unwatch(source)
+            if not self._incremental.trees:
+                self._incremental = None
+
+    def shortest_path_tree(self, source):
+        """
+        计算单源最短路径树（不提前终止）
+
+        参数:
+        source -- 源节点
+
+        返回:
+        (distances, parents) 两个字典，只包含从 source 可达的节点；
+        parents[source] 为 None
+        """
+        distances = {source: 0}
+        parents = {source: None}
+        pq = [(0, source)]
+        adj_list = self.adj_list
+
+        while pq:
+            current_distance, current_node = heappop(pq)
+            if current_distance > distances[current_node]:
+                continue
+            for neighbor, resistance in adj_list[current_node].items():
+                distance = current_distance + resistance
+                if distance < distances.get(neighbor, inf):
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heappush(pq, (distance, neighbor))
+
+        return distances, parents
+
+    def _dijkstra(self, start, end, banned_nodes=None, banned_edges=None, progress=None, stats=None,
+                  max_resistance=None):
+        """
+        Dijkstra 搜索，不输出任何信息
 
         参数:
         start -- 起始节点
         end -- 目标节点
+        banned_nodes -- 搜索中不允许经过的节点集合
+        banned_edges -- 搜索中不允许使用的 (起点, 终点) 边集合
+        progress -- 进度回调，含义同 iter_paths
+        stats -- 可选的 metrics.SearchStats，结束时累加堆操作计数
+        max_resistance -- 电阻上限，超过上限的节点不再入堆
 
         返回:
-        (最小电阻值, 路径列表)
+        (最小电阻值, 路径列表)，不可达时返回 None
         """
-        if start not in self.adj_list or end not in self.adj_list:
-            print(f"错误：节点 {start} 或 {end} 不存在")
-            return None
-
-        # 初始化距离字典和父节点字典
-        distances = {node: inf for node in self.adj_list}
-        distances[start] = 0
-        parents = {node: None for node in self.adj_list}
+        # 距离和父节点只记录搜索中实际访问到的节点
+        distances = {start: 0}
+        parents = {start: None}
 
         # 优先队列，存储 (当前距离, 节点) 元组
         pq = [(0, start)]
+        expanded = 0
+        stale = 0
+        relaxed = 0
+        reached = 0
 
         while pq:
             current_distance, current_node = heappop(pq)
 
             # 如果找到目标节点，终止搜索
             if current_node == end:
+                reached = 1
                 break
 
             # 如果当前距离大于已知最短距离，跳过
             if current_distance > distances[current_node]:
+                stale += 1
                 continue
+            expanded += 1
+            if progress is not None and not expanded % PROGRESS_INTERVAL:
+                progress(expanded)
 
             # 遍历所有邻接节点
-            for neighbor, resistance in self.adj_list[current_node].items():
+            edges = self.adj_list[current_node]
+            relaxed += len(edges)
+            for neighbor, resistance in edges.items():
+                if banned_nodes and neighbor in banned_nodes:
+                    continue
+                if banned_edges and (current_node, neighbor) in banned_edges:
+                    continue
+
                 distance = current_distance + resistance
 
                 # 如果找到更短路径，更新距离和父节点
-                if distance < distances[neighbor]:
+                if distance < distances.get(neighbor, inf):
+                    if max_resistance is not None and distance > max_resistance:
+                        continue
                     distances[neighbor] = distance
                     parents[neighbor] = current_node
                     heappush(pq, (distance, neighbor))
 
-        # 构建最短路径
-        if distances[end] == inf:
-            print(f"不存在从 {start} 到 {end} 的路径")
+        if stats is not None:
+            stats.add_heap(expanded, relaxed, expanded + stale + reached + len(pq), stale)
+
+        if end not in distances:
             return None
 
-        path = []
-        current = end
+        return distances[end], _build_path(parents, end)
+
+    def _bidirectional_dijkstra(self, start, end, progress=None, stats=None):
+        """
+        双向 Dijkstra：同时从起点沿出边、从终点沿入边搜索
+
+        两侧堆顶距离之和不小于已知最优值时停止，通常只需访问单向搜索的一小部分节点。
+
+        返回:
+        (最小电阻值, 路径列表)，不可达时返回 None
+        """
+        if start == end:
+            return 0, [start]
+
+        adjacency = (self.adj_list, self.reverse_adj_list)
+        distances = ({start: 0}, {end: 0})
+        parents = ({start: None}, {end: None})
+        heaps = ([(0, start)], [(0, end)])
+        best = inf
+        meeting_node = None
+        expanded = 0
+        stale = 0
+        relaxed = 0
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+
+            # 扩展堆顶距离较小的一侧
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            current_distance, current_node = heappop(heaps[side])
+            if current_distance > distances[side][current_node]:
+                stale += 1
+                continue
+            expanded += 1
+            if progress is not None and not expanded % PROGRESS_INTERVAL:
+                progress(expanded)
+
+            own = distances[side]
+            other = distances[1 - side]
+            edges = adjacency[side][current_node]
+            relaxed += len(edges)
+            for neighbor, resistance in edges.items():
+                distance = current_distance + resistance
+                if distance < own.get(neighbor, inf):
+                    own[neighbor] = distance
+                    parents[side][neighbor] = current_node
+                    heappush(heaps[side], (distance, neighbor))
+                    # 两侧搜索相遇，更新最优值
+                    if neighbor in other and distance + other[neighbor] < best:
+                        best = distance + other[neighbor]
+                        meeting_node = neighbor
+
+        if stats is not None:
+            pushes = expanded + stale + len(heaps[0]) + len(heaps[1])
+            stats.add_heap(expanded, relaxed, pushes, stale)
+
+        if meeting_node is None:
+            return None
+
+        # 前半段沿正向父节点回溯，后半段沿反向父节点前进
+        path = _build_path(parents[0], meeting_node)
+        current = parents[1][meeting_node]
         while current is not None:
             path.append(current)
-            current = parents[current]
-        path.reverse()
+            current = parents[1][current]
 
-        # 输出结果
-        print(f"\n最短路径：{' → '.join(path)}")
-        print(f"总电阻：{distances[end]}Ω")
+        return best, path
 
-        return distances[end], path
+    def _astar(self, start, end, heuristic, progress=None, stats=None):
+        """
+        A* 搜索
 
+        参数:
+        heuristic -- heuristic(node) 返回 node 到终点电阻的下界，必须不高估实际值，
+                     否则结果可能不是最优
 
-def main():
-    # 创建图实例
-    graph = Graph()
+        返回:
+        (最小电阻值, 路径列表)，不可达时返回 None
+        """
+        distances = {start: 0}
+        parents = {start: None}
+        # 优先队列，存储 (估计总电阻, 当前距离, 节点) 元组
+        pq = [(heuristic(start), 0, start)]
+        expanded = 0
+        stale = 0
+        relaxed = 0
+        reached = 0
 
-    # 示例：解析用户输入
-    print("请输入电路节点和边的信息：")
-    graph.parse_input()
+        while pq:
+            _, current_distance, current_node = heappop(pq)
+            if current_node == end:
+                reached = 1
+                break
+            if current_distance > distances[current_node]:
+                stale += 1
+                continue
+            expanded += 1
+            if progress is not None and not expanded % PROGRESS_INTERVAL:
+                progress(expanded)
+
+            edges = self.adj_list[current_node]
+            relaxed += len(edges)
+            for neighbor, resistance in edges.items():
+                distance = current_distance + resistance
+                if distance < distances.get(neighbor, inf):
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heappush(pq, (distance + heuristic(neighbor), distance, neighbor))
+
+        if stats is not None:
+            stats.add_heap(expanded, relaxed, expanded + stale + reached + len(pq), stale)
+
+        if end not in distances:
+            return None
+
+        return distances[end], _build_path(parents, end)
+
+    def _search(self, start, end, bidirectional, heuristic, progress, stats):
+        """按参数选择最短路径搜索方式；被关注的源节点直接查增量维护的树"""
+        index = self._current_reachability()
+        if index is not None and not index.reachable(start, end):
+            return None
+        if self._incremental is not None and start in self._incremental.trees:
+            return self._incremental.trees[start].path(end)
+        if heuristic is not None:
+            return self._astar(start, end, heuristic, progress, stats)
+        if bidirectional:
+            return self._bidirectional_dijkstra(start, end, progress, stats)
+        return self._dijkstra(start, end, progress=progress, stats=stats)
+
+    def _constrained_search(self, start, end, constraints, progress, stats):
+        """
+        带约束的最短路径：按必经节点分段运行 Dijkstra，每段都在搜索中排除禁止的节点和边
+
+        逐段贪心失败时（前面的段用掉了后面的段必须经过的节点），退回到带剪枝的
+        全路径搜索，因此返回 None 一定表示不存在满足约束的路径。
+        """
+        avoid_nodes, avoid_edges, via_nodes, max_resistance = constraints
+        waypoints = [start, *(via_nodes or ()), end]
+        for node in waypoints:
+            if node not in self.adj_list or (avoid_nodes and node in avoid_nodes):
+                return None
+        index = self._current_reachability()
+        if index is not None:
+            for i in range(len(waypoints) - 1):
+                if not index.reachable(waypoints[i], waypoints[i + 1]):
+                    return None
+
+        result = self._greedy_segments(waypoints, avoid_nodes, avoid_edges, max_resistance, progress, stats)
+        if result is not None or not via_nodes:
+            # 没有必经节点时只有一段，Dijkstra 的结果就是精确的
+            return result
+
+        paths = self._iter_paths(start, end, None, max_resistance, None, True, progress, stats,
+                                 avoid_nodes, avoid_edges, via_nodes)
+        best = min(paths, key=lambda item: item.resistance, default=None)
+        if best is None:
+            return None
+        return best.resistance, best.path
+
+    def _greedy_segments(self, waypoints, avoid_nodes, avoid_edges, max_resistance, progress, stats):
+        """依次求各段最短路径并拼接；某一段无路可走时返回 None（不代表整体无解）"""
+        total = 0
+        path = [waypoints[0]]
+        for i in range(len(waypoints) - 1):
+            target = waypoints[i + 1]
+            # 不能提前经过后面的必经节点，也不能回到前面各段已经过的节点
+            banned = set(avoid_nodes or ())
+            banned.update(waypoints[i + 2:])
+            banned.update(path[:-1])
+            if target in banned and target in path:
+                return None
+            banned.discard(target)
+            budget = None if max_resistance is None else max_resistance - total
+            segment = self._dijkstra(waypoints[i], target, banned, avoid_edges, progress, stats, budget)
+            if segment is None:
+                return None
+            total += segment[0]
+            path.extend(segment[1][1:])
+        return total, path
+
+    def shortest_path(self, start, end, bidirectional=False, heuristic=None, progress=None,
+                      avoid_nodes=None, avoid_edges=None, via_nodes=None, max_resistance=None):
+        """
+        使用 Dijkstra 算法计算两点电阻最小的路径
+
+        参数:
+        start -- 起始节点
+        end -- 目标节点
+        bidirectional -- 使用双向 Dijkstra，适合大电路上的点对点查询
+        heuristic -- 提供时使用 A* 搜索，heuristic(node) 返回 node 到 end 电阻的下界
+        progress -- 进度回调，含义同 iter_paths
+        avoid_nodes -- 路径不能经过的节点集合
+        avoid_edges -- 路径不能使用的 (起点, 终点) 边集合
+        via_nodes -- 路径必须依次经过的节点序列
+        max_resistance -- 总电阻上限
+
+        约束在 Dijkstra 搜索过程中生效，代价与普通查询相同。指定 via_nodes 时
+        依次求出各段的最短路径再拼接，后面的段不再经过前面已用过的节点，
+        因此结果总是简单路径；少数情况下这种逐段贪心不是全局最优。
+        逐段贪心找不到路径时，改用与 iter_paths 相同的剪枝回溯搜索求精确解
+        （最坏情况下代价随路径数增长），所以返回 None 时确实不存在满足约束的路径。
+        约束条件只支持单向 Dijkstra，不能与 bidirectional 或 heuristic 同时使用。
+
+        返回:
+        ShortestPath(最小电阻值, 路径列表)，节点不存在、不可达或不满足约束时返回 None
+        """
+        if bidirectional and heuristic is not None:
+            raise ValueError("bidirectional 与 heuristic 不能同时使用")
+        constrained = bool(avoid_nodes or avoid_edges or via_nodes) or max_resistance is not None
+        if constrained and (bidirectional or heuristic is not None):
+            raise ValueError("约束条件不能与 bidirectional 或 heuristic 同时使用")
+
+        if start not in self.adj_list or end not in self.adj_list:
+            self._report("nodes_missing", (start, end))
+            return None
+
+        stats = self._begin_stats("shortest_path")
+        if constrained:
+            constraints = (_as_set(avoid_nodes), _as_edge_set(avoid_edges), via_nodes, max_resistance)
+            search = lambda: self._constrained_search(start, end, constraints, progress, stats)
+        else:
+            search = lambda: self._search(start, end, bidirectional, heuristic, progress, stats)
+        if stats is None:
+            result = search()
+        else:
+            with stats.phase("search"):
+                result = search()
+            stats.paths_found = int(result is not None)
+            self._end_stats(stats)
+        if result is not None:
+            result = ShortestPath(*result)
+        self._report("shortest_path", (start, end, result))
+        return result
+
+    def k_shortest_paths(self, start, end, k):
+        """
+        使用 Yen 算法计算电阻最小的前 k 条简单路径
+
+        每找到一条路径最多调用 len(路径) 次 Dijkstra，总代价与 k 成多项式关系，
+        不需要枚举全部路径。
+
+        参数:
+        start -- 起始节点
+        end -- 目标节点
+        k -- 需要的路径数
+
+        返回:
+        按总电阻从小到大排列的 ShortestPath(总电阻值, 路径列表) 列表，可能少于 k 条
+        """
+        if k <= 0 or start not in self.adj_list or end not in self.adj_list:
+            return []
+        index = self._current_reachability()
+        if index is not None and not index.reachable(start, end):
+            return []
+
+        stats = self._begin_stats("k_shortest_paths")
+        found = self._yen(start, end, k, stats)
+        if stats is not None:
+            stats.paths_found = len(found)
+            self._end_stats(stats)
+        return [ShortestPath(*item) for item in found]
+
+    def _yen(self, start, end, k, stats):
+        """Yen 算法的实现，返回 (总电阻值, 路径列表) 列表"""
+        first = self._dijkstra(start, end, stats=stats)
+        if first is None:
+            return []
+
+        found = [first]
+        candidates = []
+        seen = {tuple(first[1])}
+
+        while len(found) < k:
+            _, last_path = found[-1]
+
+            # 路径各前缀的累计电阻
+            prefix_costs = [0]
+            for i in range(len(last_path) - 1):
+                prefix_costs.append(prefix_costs[-1] + self.adj_list[last_path[i]][last_path[i + 1]])
+
+            # 依次以上一条路径的每个节点为偏离点
+            for i in range(len(last_path) - 1):
+                spur_node = last_path[i]
+                root_path = last_path[:i + 1]
+
+                # 禁止与已有路径共用同一前缀后的下一条边，禁止回到前缀中的节点
+                banned_edges = {(path[i], path[i + 1]) for _, path in found
+                                if len(path) > i + 1 and path[:i + 1] == root_path}
+                banned_nodes = set(root_path[:-1])
+
+                spur = self._dijkstra(spur_node, end, banned_nodes, banned_edges, stats=stats)
+                if spur is None:
+                    continue
+                path = root_path[:-1] + spur[1]
+                key = tuple(path)
+                if key not in seen:
+                    seen.add(key)
+                    heappush(candidates, (prefix_costs[i] + spur[0], path))
+
+            if not candidates:
+                break
+            found.append(heappop(candidates))
+
+        return found
+
+
+def main():
+    # 可以直接从网表文件加载，否则逐行手动输入
+    path = input("输入网表文件路径（直接回车则手动输入）：").strip()
+    if path:
+        try:
+            graph = Graph.load(path, reporter=console_reporter)
+        except OSError as e:
+            print(f"无法读取文件：{e}")
+            return
+    else:
+        graph = Graph(reporter=console_reporter)
+        print("请输入电路节点和边的信息：")
+        graph.parse_input()
 
     # 显示初始邻接表
     graph.display_graph()
 
     # 示例动态操作
     while True:
-        action = input("\n选择操作\n1 添加边\n2 删除节点\n3 删除边\n4 环路检测\n5 全路径仿真\n6 最短路径\n0 退出程序：").strip().lower()
+        action = input("\n选择操作\n1 添加边\n2 删除节点\n3 删除边\n4 环路检测\n5 全路径仿真\n6 最短路径\n7 前 k 条最短路径\n8 等效电阻\n0 退出程序：").strip().lower()
         if action == "1":
             try:
                 start, end, resistance = input("输入边信息（格式：起点 终点 电阻值）：").split()
@@ -297,6 +1482,26 @@ def main():
                 graph.shortest_path(start, end)
             except ValueError:
                 print("输入格式错误")
+        elif action == "7":
+            try:
+                start, end, k = input("输入起点、终点和路径数（格式：起点 终点 k）：").split()
+                paths = graph.k_shortest_paths(start, end, int(k))
+                if not paths:
+                    print(f"不存在从 {start} 到 {end} 的路径")
+                for i, (resistance, path) in enumerate(paths, 1):
+                    print(f"{i}. {' → '.join(path)} ({resistance}Ω)")
+            except ValueError:
+                print("输入格式错误")
+        elif action == "8":
+            try:
+                a, b = input("输入两个节点（格式：节点A 节点B）：").split()
+                resistance = graph.equivalent_resistance(a, b)
+                if resistance is None:
+                    print(f"错误：节点 {a} 或 {b} 不存在")
+                else:
+                    print(f"等效电阻：{resistance}Ω")
+            except ValueError as e:
+                print(f"输入错误：{e}")
         elif action == "0":
             print("退出程序")
             break
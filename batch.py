@@ -0,0 +1,94 @@
+"""
+多进程批量查询
+
+图只在开始时写成一次二进制快照，各工作进程在初始化时以 mmap 方式打开它，
+之后每个任务只传递查询本身，不再重复序列化整个图；多个进程通过页缓存共享同一份数据。
+
+查询格式为元组：(方法名, 位置参数..., [关键字参数字典])，例如
+    ("shortest_path", "A", "B")
+    ("all_paths_simulation", "A", "B", {"max_paths": 100})
+    ("detect_cycles", {"max_length": 6})
+方法在工作进程中的 CompactGraph 上执行。
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from snapshot import open_snapshot, save_snapshot
+
+# 允许在工作进程中执行的 CompactGraph 方法
+QUERY_METHODS = {
+    "shortest_path",
+    "all_paths_simulation",
+    "detect_cycles",
+    "has_cycles",
+    "cycle_nodes",
+    "strongly_connected_components",
+}
+
+# 工作进程中打开的快照
+_worker_graph = None
+
+
+def _init_worker(path):
+    global _worker_graph
+    _worker_graph = open_snapshot(path)
+
+
+def _split_query(query):
+    """拆分查询为 (方法名, 位置参数, 关键字参数)"""
+    name, *args = query
+    if name not in QUERY_METHODS:
+        raise ValueError(f"不支持的查询：{name}")
+    kwargs = {}
+    if args and isinstance(args[-1], dict):
+        kwargs = args.pop()
+    return name, args, kwargs
+
+
+def _run_chunk(chunk):
+    """在工作进程中执行一组查询，返回 [(序号, 结果), ...]"""
+    results = []
+    for index, query in chunk:
+        name, args, kwargs = _split_query(query)
+        results.append((index, getattr(_worker_graph, name)(*args, **kwargs)))
+    return results
+
+
+def run_batch(compact, queries, workers=None, chunksize=1):
+    """
+    在进程池中并行执行查询，按完成顺序逐个产生结果
+
+    参数:
+    compact -- CompactGraph
+    queries -- 查询序列，格式见模块说明
+    workers -- 工作进程数，默认为 CPU 核数
+    chunksize -- 每个任务包含的查询数；查询很小时调大可以减少进程间通信
+
+    返回:
+    生成器，每次产生 (序号, 查询, 结果)，序号为查询在输入中的位置
+    """
+    queries = list(queries)
+    # 提前检查格式，避免在工作进程中才失败
+    for query in queries:
+        _split_query(query)
+
+    directory = tempfile.mkdtemp(prefix="circuit-batch-")
+    path = os.path.join(directory, "graph.snap")
+    pool = None
+    try:
+        save_snapshot(compact, path)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,))
+        indexed = list(enumerate(queries))
+        futures = [pool.submit(_run_chunk, indexed[i:i + chunksize])
+                   for i in range(0, len(indexed), chunksize)]
+        for future in as_completed(futures):
+            for index, result in future.result():
+                yield index, queries[index], result
+    finally:
+        # 调用方提前停止迭代时取消尚未开始的任务
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
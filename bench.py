@@ -0,0 +1,271 @@
+"""
+基准测试
+
+用固定随机种子生成不同结构、不同规模的合成电路，测量 Graph 各项操作的耗时
+和峰值内存，结果写成 JSON；可以与保存的基线比较，超过阈值时以非零状态退出。
+全部离线运行，不依赖任何外部数据。
+
+用法:
+python bench.py                                 # 运行默认规模，输出到标准输出
+python bench.py --sizes 100 1000 -o result.json # 指定规模并保存结果
+python bench.py --baseline base.json            # 与基线比较，变慢或峰值内存增长超过阈值时失败
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from back import Graph
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_SEED = 12345
+DEFAULT_REPEAT = 3
+# 耗时超过基线的倍数即视为退化
+DEFAULT_THRESHOLD = 1.5
+# 低于这个耗时（秒）的测量受计时噪声影响太大，不参与比较
+NOISE_FLOOR = 0.001
+# 峰值内存超过基线的倍数即视为退化
+DEFAULT_MAX_MEMORY_RATIO = 1.5
+# 低于这个峰值内存（字节）的测量不参与比较，小规模下的几次分配就可能翻倍
+MEMORY_NOISE_FLOOR = 64 * 1024
+# 全路径与环路枚举的数量上限，避免在稠密图上运行指数时间
+MAX_PATHS = 1000
+MAX_CYCLES = 1000
+# 每次测量删除的节点数
+DELETE_COUNT = 100
+
+
+def _resistance(rng):
+    return round(rng.uniform(1, 100), 2)
+
+
+def chain(size, rng):
+    """n0 → n1 → … 的单链"""
+    return [(f"n{i}", f"n{i + 1}", _resistance(rng)) for i in range(size - 1)]
+
+
+def grid(size, rng):
+    """
+    边长约为 sqrt(size) 的电阻网格，电流方向向右、向下
+
+    双向连接的网格中自回避路径的数量随边长指数增长，全路径搜索无法在合理时间内完成，
+    因此这里只保留两个方向；包含大量环路的情形由 dense_digraph 覆盖。
+    """
+    side = max(2, int(size ** 0.5))
+    edges = []
+    for row in range(side):
+        for col in range(side):
+            node = f"g{row}_{col}"
+            if col + 1 < side:
+                edges.append((node, f"g{row}_{col + 1}", _resistance(rng)))
+            if row + 1 < side:
+                edges.append((node, f"g{row + 1}_{col}", _resistance(rng)))
+    return edges
+
+
+def random_dag(size, rng, degree=3):
+    """随机有向无环图，每个节点向编号更大的节点连 degree 条边"""
+    edges = [(f"d{i}", f"d{i + 1}", _resistance(rng)) for i in range(size - 1)]
+    for i in range(size - 2):
+        for _ in range(degree - 1):
+            edges.append((f"d{i}", f"d{rng.randrange(i + 1, size)}", _resistance(rng)))
+    return edges
+
+
+def dense_digraph(size, rng, degree=10):
+    """随机有向图，每个节点有 degree 条出边，包含大量环路"""
+    edges = []
+    for i in range(size):
+        for _ in range(degree):
+            j = rng.randrange(size)
+            if j != i:
+                edges.append((f"r{i}", f"r{j}", _resistance(rng)))
+    return edges
+
+
+def ladder(size, rng):
+    """梯形网络：两条平行导轨 a、b，每一级之间有一根横档"""
+    rungs = max(2, size // 2)
+    edges = []
+    for i in range(rungs):
+        edges.append((f"a{i}", f"b{i}", _resistance(rng)))
+        if i + 1 < rungs:
+            edges.append((f"a{i}", f"a{i + 1}", _resistance(rng)))
+            edges.append((f"b{i}", f"b{i + 1}", _resistance(rng)))
+    return edges
+
+
+GENERATORS = {
+    "chain": chain,
+    "grid": grid,
+    "random_dag": random_dag,
+    "dense_digraph": dense_digraph,
+    "ladder": ladder,
+}
+
+
+def _endpoints(edges):
+    """取第一条边的起点和最后一条边的终点作为查询端点"""
+    return edges[0][0], edges[-1][1]
+
+
+def _operations(edges, rng):
+    """
+    返回 [(操作名, 准备函数, 被测函数)]
+
+    准备函数不计时，返回传给被测函数的参数；被测操作会修改图时在准备阶段重新建图。
+    """
+    start, end = _endpoints(edges)
+    nodes = list(dict.fromkeys(node for edge in edges for node in edge[:2]))
+    victims = rng.sample(nodes, min(DELETE_COUNT, len(nodes)))
+
+    def built():
+        return Graph.from_edges(edges)
+
+    def delete_nodes(graph):
+        for node in victims:
+            graph.delete_node(node)
+
+    return [
+        ("build", lambda: edges, Graph.from_edges),
+        ("shortest_path", built, lambda graph: graph.shortest_path(start, end)),
+        ("all_paths_simulation", built,
+         lambda graph: graph.all_paths_simulation(start, end, max_paths=MAX_PATHS)),
+        ("detect_cycles", built, lambda graph: graph.detect_cycles(max_cycles=MAX_CYCLES)),
+        ("delete_node", built, delete_nodes),
+    ]
+
+
+def _measure(setup, func, repeat):
+    """返回 (最短耗时, 峰值内存字节数)；峰值内存单独测一次，避免 tracemalloc 影响计时"""
+    best = None
+    for _ in range(repeat):
+        argument = setup()
+        begin = time.perf_counter()
+        func(argument)
+        elapsed = time.perf_counter() - begin
+        if best is None or elapsed < best:
+            best = elapsed
+
+    argument = setup()
+    tracemalloc.start()
+    try:
+        func(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(generators=None, sizes=DEFAULT_SIZES, seed=DEFAULT_SEED, repeat=DEFAULT_REPEAT, log=None):
+    """
+    运行基准测试
+
+    参数:
+    generators -- 要运行的生成器名称列表，默认全部
+    sizes -- 电路规模（约等于节点数）列表
+    seed -- 随机种子，相同种子生成相同的电路
+    repeat -- 每项计时重复的次数，取最小值
+    log -- 可选的进度回调 log(文字)
+
+    返回:
+    可直接写成 JSON 的结果字典，results 的键为 "生成器/规模/操作"
+    """
+    results = {}
+    for name in generators or GENERATORS:
+        for size in sizes:
+            rng = random.Random(f"{seed}/{name}/{size}")
+            edges = GENERATORS[name](size, rng)
+            for operation, setup, func in _operations(edges, rng):
+                seconds, peak = _measure(setup, func, repeat)
+                key = f"{name}/{size}/{operation}"
+                results[key] = {"seconds": seconds, "peak_bytes": peak}
+                if log is not None:
+                    log(f"{key}: {seconds * 1000:.2f} ms, 峰值 {peak / 1024:.0f} KiB")
+    return {
+        "meta": {
+            "seed": seed,
+            "repeat": repeat,
+            "sizes": list(sizes),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, max_memory_ratio=DEFAULT_MAX_MEMORY_RATIO):
+    """
+    与基线比较耗时和峰值内存
+
+    参数:
+    current, baseline -- run() 的返回值
+    threshold -- 允许的耗时倍数
+    max_memory_ratio -- 允许的峰值内存倍数
+
+    返回:
+    退化项列表 [(键, 指标, 基线值, 当前值)]，指标为 "seconds" 或 "peak_bytes"；
+    两边都低于 NOISE_FLOOR / MEMORY_NOISE_FLOOR 的项不比较
+    """
+    limits = (("seconds", threshold, NOISE_FLOOR), ("peak_bytes", max_memory_ratio, MEMORY_NOISE_FLOOR))
+    regressions = []
+    old_results = baseline["results"]
+    for key, entry in current["results"].items():
+        old = old_results.get(key)
+        if old is None:
+            continue
+        for metric, ratio, floor in limits:
+            if metric not in old or metric not in entry:
+                continue
+            if max(old[metric], entry[metric]) < floor:
+                continue
+            if entry[metric] > old[metric] * ratio:
+                regressions.append((key, metric, old[metric], entry[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电路分析基准测试")
+    parser.add_argument("--generators", nargs="+", choices=sorted(GENERATORS), help="要运行的电路结构")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="电路规模")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("-o", "--output", help="结果 JSON 文件，默认输出到标准输出")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON 文件")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="允许的耗时倍数")
+    parser.add_argument("--max-memory-ratio", type=float, default=DEFAULT_MAX_MEMORY_RATIO,
+                        help="允许的峰值内存倍数")
+    args = parser.parse_args(argv)
+
+    def log(text):
+        print(text, file=sys.stderr)
+
+    current = run(args.generators, args.sizes, args.seed, args.repeat, log)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(current, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold, args.max_memory_ratio)
+        for key, metric, old, new in regressions:
+            if metric == "seconds":
+                log(f"退化：{key} {old * 1000:.2f} ms → {new * 1000:.2f} ms")
+            else:
+                log(f"退化：{key} 峰值 {old / 1024:.0f} KiB → {new / 1024:.0f} KiB")
+        if regressions:
+            return 1
+        log("未发现超过阈值的退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
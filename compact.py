@@ -0,0 +1,309 @@
+"""
+紧凑的只读图表示（CSR 格式）
+
+节点名称被映射为 0..V-1 的整数编号，边按起点分组存放在三个数组中：
+offsets[i]..offsets[i+1] 是节点 i 的出边在 targets / resistances 中的区间。
+相比字典嵌套字典，每条边只占 12 字节，遍历时也不需要哈希查找。
+算法全部在整数编号上运行，只在返回结果时翻译回节点名称。
+"""
+from array import array
+from heapq import heappush, heappop
+from itertools import islice
+from math import inf
+
+from cycles import strongly_connected_components, cyclic_components, simple_cycles, normalize_cycle
+from results import ShortestPath, CircuitPath
+
+
+class CompactGraph:
+    def __init__(self, names, offsets, targets, resistances):
+        """
+        参数:
+        names -- 节点名称序列，下标即节点编号
+        offsets -- 长度为 V+1 的边区间数组
+        targets -- 长度为 E 的终点编号数组
+        resistances -- 长度为 E 的电阻值数组
+        """
+        self.names = names
+        self.offsets = offsets
+        self.targets = targets
+        self.resistances = resistances
+        self.successors = _Successors(offsets, targets)
+        self._index = None
+        self._reverse = None
+        # 从快照映射打开时持有 mmap 对象
+        self._buffer = None
+
+    @property
+    def index(self):
+        """节点名称到编号的映射，首次使用时构建"""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index
+
+    @classmethod
+    def from_graph(cls, graph):
+        """从可编辑的 Graph 构建紧凑表示"""
+        adj_list = graph.adj_list
+        names = list(adj_list)
+        index = {name: i for i, name in enumerate(names)}
+
+        offsets = array('q', [0])
+        targets = array('i')
+        resistances = array('d')
+        for name in names:
+            edges = adj_list[name]
+            targets.extend(index[end] for end in edges)
+            resistances.extend(edges.values())
+            offsets.append(len(targets))
+
+        return cls(names, offsets, targets, resistances)
+
+    def save_snapshot(self, path):
+        """保存为二进制快照，见 snapshot 模块"""
+        from snapshot import save_snapshot
+
+        save_snapshot(self, path)
+
+    def close(self):
+        """释放快照的内存映射；之后不能再使用该对象"""
+        if self._buffer is None:
+            return
+        for name in ("offsets", "targets", "resistances"):
+            getattr(self, name).release()
+        self.names.offsets.release()
+        self.names.blob.release()
+        self._buffer.close()
+        self._buffer = None
+
+    def to_graph(self):
+        """转换回可编辑的 Graph"""
+        from back import Graph
+
+        names = self.names
+        graph = Graph()
+        for name in names:
+            graph._add_node(name)
+        graph._add_edges(((name, names[end], resistance)
+                          for i, name in enumerate(names)
+                          for end, resistance in self.edges_from(i)), record=False)
+        # 转换得到的是一张新图，不需要撤销到空图
+        graph.clear_history()
+        return graph
+
+    def node_count(self):
+        return len(self.names)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def edges_from(self, node_id):
+        """返回节点编号的所有出边 (终点编号, 电阻值)"""
+        begin, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return zip(self.targets[begin:end], self.resistances[begin:end])
+
+    def _path_names(self, ids):
+        names = self.names
+        return [names[i] for i in ids]
+
+    def strongly_connected_components(self):
+        """计算所有强连通分量，返回节点名称列表的列表"""
+        return [self._path_names(component)
+                for component in strongly_connected_components(self.successors)]
+
+    def cycle_nodes(self):
+        """返回位于某个非法环路上的所有节点名称集合"""
+        nodes = set()
+        for component in cyclic_components(self.successors):
+            nodes.update(self._path_names(component))
+        return nodes
+
+    def has_cycles(self):
+        """判断图中是否存在非法环路"""
+        return bool(cyclic_components(self.successors))
+
+    def iter_cycles(self, max_cycles=None, max_length=None, progress=None):
+        """逐个产生标准化后的基本环路，参数含义同 Graph.iter_cycles"""
+        cycles = simple_cycles(self.successors, max_length, progress)
+        if max_cycles is not None:
+            cycles = islice(cycles, max_cycles)
+        for cycle in cycles:
+            yield normalize_cycle(self._path_names(cycle))
+
+    def detect_cycles(self, max_cycles=None, max_length=None):
+        """返回所有非法环路的集合，结果与 Graph.detect_cycles 相同"""
+        return set(self.iter_cycles(max_cycles, max_length))
+
+    def reverse(self):
+        """
+        返回反向 CSR 数组 (offsets, sources, resistances)
+
+        sources[offsets[i]:offsets[i+1]] 是所有指向节点 i 的起点。
+        紧凑图不可变，结果在首次调用后缓存。
+        """
+        if self._reverse is None:
+            node_count = self.node_count()
+            offsets = self.offsets
+            targets = self.targets
+            resistances = self.resistances
+
+            # 计数排序：先统计入度，再按终点分桶
+            counts = [0] * (node_count + 1)
+            for target in targets:
+                counts[target + 1] += 1
+            for i in range(node_count):
+                counts[i + 1] += counts[i]
+            reverse_offsets = array('q', counts)
+
+            positions = counts[:-1]
+            sources = array('i', bytes(4 * len(targets)))
+            reverse_resistances = array('d', bytes(8 * len(targets)))
+            for node in range(node_count):
+                for i in range(offsets[node], offsets[node + 1]):
+                    target = targets[i]
+                    position = positions[target]
+                    sources[position] = node
+                    reverse_resistances[position] = resistances[i]
+                    positions[target] = position + 1
+
+            self._reverse = (reverse_offsets, sources, reverse_resistances)
+        return self._reverse
+
+    def _nodes_reaching(self, target):
+        """返回标记数组，能到达 target 的节点（含自身）标记为 1"""
+        offsets, sources, _ = self.reverse()
+        reached = bytearray(self.node_count())
+        reached[target] = 1
+        stack = [target]
+        while stack:
+            node = stack.pop()
+            for source in sources[offsets[node]:offsets[node + 1]]:
+                if not reached[source]:
+                    reached[source] = 1
+                    stack.append(source)
+        return reached
+
+    def iter_paths(self, start_node, end_node, max_paths=None, max_resistance=None, max_depth=None,
+                   prune_unreachable=True):
+        """逐条产生简单路径及总电阻值，参数含义同 Graph.iter_paths"""
+        if start_node not in self.index or end_node not in self.index:
+            return
+        if start_node == end_node:
+            yield CircuitPath([start_node], 0)
+            return
+        if max_paths is not None and max_paths <= 0:
+            return
+
+        start = self.index[start_node]
+        end = self.index[end_node]
+        reachable = self._nodes_reaching(end) if prune_unreachable else None
+        if reachable is not None and not reachable[start]:
+            return
+
+        count = 0
+        visited = bytearray(self.node_count())
+        visited[start] = 1
+        current_path = [start]
+        sums = [0]
+        stack = [self.edges_from(start)]
+
+        # 迭代回溯，避免深链触发递归上限
+        while stack:
+            for neighbor, resistance in stack[-1]:
+                if visited[neighbor]:
+                    continue
+                resistance_sum = sums[-1] + resistance
+                if max_resistance is not None and resistance_sum > max_resistance:
+                    continue
+                if max_depth is not None and len(current_path) > max_depth:
+                    continue
+                if neighbor == end:
+                    yield CircuitPath(self._path_names(current_path) + [end_node], resistance_sum)
+                    count += 1
+                    if max_paths is not None and count >= max_paths:
+                        return
+                    continue
+                if reachable is not None and not reachable[neighbor]:
+                    continue
+                visited[neighbor] = 1
+                current_path.append(neighbor)
+                sums.append(resistance_sum)
+                stack.append(self.edges_from(neighbor))
+                break
+            else:
+                stack.pop()
+                visited[current_path.pop()] = 0
+                sums.pop()
+
+    def all_paths_simulation(self, start_node, end_node, max_paths=None, max_resistance=None, max_depth=None):
+        """
+        计算从起点到终点的所有简单路径及总电阻值
+
+        返回:
+        CircuitPath(路径, 总电阻值) 列表；节点不存在时返回空列表
+        """
+        return list(self.iter_paths(start_node, end_node, max_paths, max_resistance, max_depth))
+
+    def shortest_path(self, start, end):
+        """
+        使用 Dijkstra 算法计算两点电阻最小的路径
+
+        返回:
+        ShortestPath(最小电阻值, 路径列表)，节点不存在或不可达时返回 None
+        """
+        if start not in self.index or end not in self.index:
+            return None
+
+        source = self.index[start]
+        target = self.index[end]
+        offsets = self.offsets
+        targets = self.targets
+        resistances = self.resistances
+
+        distances = {source: 0}
+        parents = {source: -1}
+        pq = [(0, source)]
+
+        while pq:
+            current_distance, current_node = heappop(pq)
+            if current_node == target:
+                break
+            if current_distance > distances[current_node]:
+                continue
+
+            begin, stop = offsets[current_node], offsets[current_node + 1]
+            for neighbor, resistance in zip(targets[begin:stop], resistances[begin:stop]):
+                distance = current_distance + resistance
+                if distance < distances.get(neighbor, inf):
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heappush(pq, (distance, neighbor))
+
+        if target not in distances:
+            return None
+
+        path = []
+        current = target
+        while current != -1:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+
+        return ShortestPath(distances[target], self._path_names(path))
+
+
+class _Successors:
+    """把 CSR 数组包装成 cycles 模块需要的后继映射"""
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        return iter(range(len(self.offsets) - 1))
+
+    def __getitem__(self, node_id):
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
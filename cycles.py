@@ -0,0 +1,287 @@
+"""
+环路分析算法
+
+这里的函数只依赖一个"后继映射" adj：迭代 adj 得到全部节点，
+adj[node] 可迭代得到该节点的所有后继节点。Graph.adj_list
+（字典嵌套字典）可以直接传入，其他存储结构只需提供同样的接口。
+"""
+
+# 每扩展这么多个节点调用一次进度回调
+PROGRESS_INTERVAL = 1024
+
+
+def strongly_connected_components(adj):
+    """
+    迭代版 Tarjan 算法，计算有向图的强连通分量，时间复杂度 O(V+E)
+
+    不使用递归，因此链路深度不受 Python 递归上限限制。
+
+    参数:
+    adj -- 后继映射
+
+    返回:
+    生成器，按逆拓扑序逐个产生强连通分量（节点列表）
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    counter = 0
+
+    for root in adj:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        # 显式工作栈，每项为 (节点, 后继迭代器)
+        work = [(root, iter(adj[root]))]
+
+        while work:
+            node, neighbors = work[-1]
+            descended = False
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(adj[neighbor])))
+                    descended = True
+                    break
+                if neighbor in on_stack and index[neighbor] < lowlink[node]:
+                    lowlink[node] = index[neighbor]
+            if descended:
+                continue
+
+            # 当前节点的后继已全部处理，回退到父节点
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+
+            # 当前节点是分量的根，弹出整个分量
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                yield component
+
+
+def cyclic_components(adj):
+    """
+    返回所有包含环路的强连通分量
+
+    节点数大于 1 的分量必然包含环路；单节点分量只有存在自环时才算。
+    """
+    cyclic = []
+    for component in strongly_connected_components(adj):
+        if len(component) > 1:
+            cyclic.append(component)
+        else:
+            node = component[0]
+            if node in adj[node]:
+                cyclic.append(component)
+    return cyclic
+
+
+def normalize_cycle(cycle):
+    """
+    标准化环路表示，使相同环路具有相同表示
+
+    从字典序最小的节点开始旋转环路，并在末尾补上起点，
+    例如 [B, C, A] -> (A, B, C, A)。
+    """
+    min_node_idx = 0
+    min_node = cycle[0]
+    for i, n in enumerate(cycle):
+        if n < min_node:
+            min_node = n
+            min_node_idx = i
+    return tuple(cycle[min_node_idx:]) + tuple(cycle[:min_node_idx]) + (min_node,)
+
+
+def simple_cycles(adj, max_length=None, progress=None, stats=None):
+    """
+    枚举有向图中的所有基本环路（每个环路只产生一次）
+
+    不限长度时使用 Johnson 算法，每个环路的代价为 O(V+E)；
+    指定 max_length 时 Johnson 的阻塞规则不再成立，改为在每个
+    强连通分量内做深度受限的搜索。两种方式都是生成器，调用方可以
+    随时停止迭代。
+
+    参数:
+    adj -- 后继映射
+    max_length -- 环路最多包含的节点数，None 表示不限
+    progress -- 进度回调，每扩展 PROGRESS_INTERVAL 个节点以已扩展节点数调用一次
+    stats -- 可选的 metrics.SearchStats，结束时写入扩展节点数、最大深度和环路数
+
+    返回:
+    生成器，每次产生一个环路的节点列表（不重复起点），自环为 [node]
+    """
+    if stats is None:
+        return _simple_cycles(adj, max_length, _ProgressCounter(progress), None)
+    return _counted_cycles(adj, max_length, _ProgressCounter(progress), stats)
+
+
+def _counted_cycles(adj, max_length, counter, stats):
+    """统计开启时的 simple_cycles，结束或被关闭时写入计数"""
+    found = 0
+    try:
+        for cycle in _simple_cycles(adj, max_length, counter, stats):
+            found += 1
+            yield cycle
+    finally:
+        stats.nodes_expanded += counter.expanded
+        stats.max_depth = max(stats.max_depth, counter.deepest)
+        stats.cycles_found += found
+
+
+def _simple_cycles(adj, max_length, counter, stats):
+    if max_length is not None and max_length < 1:
+        return
+
+    if stats is None:
+        components = cyclic_components(adj)
+    else:
+        with stats.phase("components"):
+            components = cyclic_components(adj)
+
+    # 先单独产生自环，之后的搜索中忽略自环边
+    for component in components:
+        for node in component:
+            if node in adj[node]:
+                yield [node]
+
+    if max_length == 1:
+        return
+
+    for component in components:
+        if len(component) < 2:
+            continue
+        members = set(component)
+        subgraph = {node: [n for n in adj[node] if n in members and n != node]
+                    for node in component}
+        if max_length is None:
+            yield from _johnson(subgraph, counter)
+        else:
+            yield from _bounded_cycles(subgraph, max_length, counter)
+
+
+class _ProgressCounter:
+    """统计扩展的节点数和最大搜索深度，按固定间隔调用进度回调"""
+
+    def __init__(self, progress):
+        self.progress = progress
+        self.expanded = 0
+        self.deepest = 0
+
+    def step(self, depth):
+        self.expanded += 1
+        if depth > self.deepest:
+            self.deepest = depth
+        if self.progress is not None and not self.expanded % PROGRESS_INTERVAL:
+            self.progress(self.expanded)
+
+
+def _subgraph_components(subgraph):
+    """在子图上重新计算强连通分量，只保留节点数大于 1 的分量"""
+    result = []
+    for component in strongly_connected_components(subgraph):
+        if len(component) > 1:
+            members = set(component)
+            result.append({node: [n for n in subgraph[node] if n in members]
+                           for node in component})
+    return result
+
+
+def _johnson(subgraph, counter):
+    """Johnson 算法（迭代实现），subgraph 为不含自环的强连通子图"""
+    pending = [subgraph]
+
+    while pending:
+        graph = pending.pop()
+        start_node = next(iter(graph))
+
+        path = [start_node]
+        blocked = {start_node}
+        closed = set()
+        block_map = {}
+        stack = [(start_node, list(graph[start_node]))]
+
+        while stack:
+            node, neighbors = stack[-1]
+            if neighbors:
+                next_node = neighbors.pop()
+                if next_node == start_node:
+                    yield path[:]
+                    closed.update(path)
+                elif next_node not in blocked:
+                    path.append(next_node)
+                    stack.append((next_node, list(graph[next_node])))
+                    closed.discard(next_node)
+                    blocked.add(next_node)
+                    counter.step(len(path))
+                    continue
+
+            if not neighbors:
+                if node in closed:
+                    _unblock(node, blocked, block_map)
+                else:
+                    for neighbor in graph[node]:
+                        block_map.setdefault(neighbor, set()).add(node)
+                stack.pop()
+                path.pop()
+
+        # 去掉起点后继续处理剩余子图
+        del graph[start_node]
+        for node in graph:
+            graph[node] = [n for n in graph[node] if n != start_node]
+        pending.extend(_subgraph_components(graph))
+
+
+def _unblock(node, blocked, block_map):
+    """解除节点及其依赖节点的阻塞"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current in blocked:
+            blocked.remove(current)
+            stack.extend(block_map.pop(current, ()))
+
+
+def _bounded_cycles(subgraph, max_length, counter):
+    """
+    深度受限的环路枚举
+
+    节点按顺序编号，每个环路只从其编号最小的节点出发搜索一次，
+    搜索中只经过编号更大的节点，因此不会重复。
+    """
+    order = {node: i for i, node in enumerate(subgraph)}
+
+    for start_node, start_idx in order.items():
+        path = [start_node]
+        on_path = {start_node}
+        stack = [iter(subgraph[start_node])]
+
+        while stack:
+            for neighbor in stack[-1]:
+                if neighbor == start_node:
+                    yield path[:]
+                elif (order[neighbor] > start_idx and neighbor not in on_path
+                      and len(path) < max_length):
+                    path.append(neighbor)
+                    on_path.add(neighbor)
+                    stack.append(iter(subgraph[neighbor]))
+                    counter.step(len(path))
+                    break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
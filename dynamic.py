@@ -0,0 +1,182 @@
+"""
+增量维护的单源最短路径树
+
+对被"关注"的源节点，图每次修改后只修复受影响的部分，而不是重新运行完整的
+Dijkstra（Ramalingam–Reps 思路）：
+
+- 添加边或减小电阻：只可能让距离变小，从该边的终点开始做一次局部 Dijkstra 松弛；
+- 删除树边、增大树边电阻或删除节点：只有该边终点在树中的子树会受影响，
+  先把子树中的节点全部作废，再从子树外的前驱节点出发，在子树内部重新计算。
+
+非树边的删除或增大不会改变任何最短距离，直接忽略。电阻值应为非负数。
+"""
+from heapq import heappush, heappop
+from math import inf
+
+from results import ShortestPath
+
+
+class ShortestPathTree:
+    """一个源节点的最短路径树，由 IncrementalShortestPaths 负责更新"""
+
+    def __init__(self, source):
+        self.source = source
+        self.distances = {}
+        self.parents = {}
+        self.children = {}
+
+    def distance(self, end):
+        """返回到 end 的最小电阻值，不可达时返回 inf"""
+        return self.distances.get(end, inf)
+
+    def path(self, end):
+        """
+        返回到 end 的最短路径
+
+        返回:
+        ShortestPath(最小电阻值, 路径列表)，不可达时返回 None
+        """
+        if end not in self.distances:
+            return None
+        path = []
+        current = end
+        while current is not None:
+            path.append(current)
+            current = self.parents[current]
+        path.reverse()
+        return ShortestPath(self.distances[end], path)
+
+    def _set_parent(self, node, parent):
+        old = self.parents.get(node)
+        if old is not None:
+            self.children[old].discard(node)
+        self.parents[node] = parent
+        if parent is not None:
+            self.children.setdefault(parent, set()).add(node)
+
+
+class IncrementalShortestPaths:
+    """
+    管理一个图上所有被关注的最短路径树
+
+    Graph 在每次修改后调用 edge_set / edge_removed / node_added / node_removed。
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.trees = {}
+
+    def watch(self, source):
+        """开始关注 source，返回其最短路径树"""
+        tree = self.trees.get(source)
+        if tree is None:
+            tree = self.trees[source] = ShortestPathTree(source)
+            if source in self.graph.adj_list:
+                tree.distances[source] = 0
+                tree.parents[source] = None
+                self._propagate(tree, [(0, source)])
+        return tree
+
+    def unwatch(self, source):
+        self.trees.pop(source, None)
+
+    def _propagate(self, tree, heap):
+        """从堆中的节点出发做 Dijkstra 松弛，只处理距离变小的节点"""
+        adj_list = self.graph.adj_list
+        distances = tree.distances
+        while heap:
+            distance, node = heappop(heap)
+            if distance > distances.get(node, inf):
+                continue
+            for neighbor, resistance in adj_list[node].items():
+                candidate = distance + resistance
+                if candidate < distances.get(neighbor, inf):
+                    distances[neighbor] = candidate
+                    tree._set_parent(neighbor, node)
+                    heappush(heap, (candidate, neighbor))
+
+    def _repair(self, tree, root):
+        """root 的父边失效：作废其子树并在子树内部重新计算"""
+        distances = tree.distances
+        if root not in distances:
+            return
+
+        # 收集受影响的子树
+        affected = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node not in affected:
+                affected.add(node)
+                stack.extend(tree.children.get(node, ()))
+
+        for node in affected:
+            parent = tree.parents.pop(node)
+            del distances[node]
+            tree.children.pop(node, None)
+            if parent is not None and parent not in affected:
+                tree.children[parent].discard(node)
+
+        # 从子树外的前驱得到初始的候选距离
+        adj_list = self.graph.adj_list
+        reverse_adj_list = self.graph.reverse_adj_list
+        tentative = {}
+        heap = []
+        for node in affected:
+            if node not in adj_list:
+                continue
+            best, best_parent = inf, None
+            for predecessor, resistance in reverse_adj_list[node].items():
+                base = distances.get(predecessor)
+                if base is not None and base + resistance < best:
+                    best, best_parent = base + resistance, predecessor
+            if best_parent is not None:
+                tentative[node] = (best, best_parent)
+                heappush(heap, (best, node))
+
+        # 只在受影响的节点之间运行 Dijkstra
+        while heap:
+            distance, node = heappop(heap)
+            if node in distances or tentative[node][0] < distance:
+                continue
+            distances[node] = distance
+            tree._set_parent(node, tentative[node][1])
+            for neighbor, resistance in adj_list[node].items():
+                if neighbor in affected and neighbor not in distances:
+                    candidate = distance + resistance
+                    if candidate < tentative.get(neighbor, (inf, None))[0]:
+                        tentative[neighbor] = (candidate, node)
+                        heappush(heap, (candidate, neighbor))
+
+    def node_added(self, node):
+        tree = self.trees.get(node)
+        if tree is not None and node not in tree.distances:
+            tree.distances[node] = 0
+            tree.parents[node] = None
+
+    def edge_set(self, start, end, old, resistance):
+        """start → end 被添加（old 为 None）或电阻由 old 改为 resistance"""
+        for tree in self.trees.values():
+            if old is not None and resistance > old and tree.parents.get(end) == start:
+                self._repair(tree, end)
+            elif start in tree.distances:
+                candidate = tree.distances[start] + resistance
+                if candidate < tree.distances.get(end, inf):
+                    tree.distances[end] = candidate
+                    tree._set_parent(end, start)
+                    self._propagate(tree, [(candidate, end)])
+
+    def edge_removed(self, start, end):
+        for tree in self.trees.values():
+            if tree.parents.get(end) == start:
+                self._repair(tree, end)
+
+    def node_removed(self, node):
+        """node 及其所有出边和入边已从图中删除"""
+        for tree in self.trees.values():
+            if node == tree.source:
+                tree.distances.clear()
+                tree.parents.clear()
+                tree.children.clear()
+            else:
+                self._repair(tree, node)
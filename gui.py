@@ -1,6 +1,38 @@
+import io
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-from back import Graph
+from tkinter import ttk, messagebox, filedialog
+from back import Graph, SearchCancelled
+from netlist import NetlistReader
+from resultview import ResultView
+
+# "显示所有路径" 默认最多显示的路径数（结果列表是虚拟化的，上限只受内存限制）
+MAX_DISPLAY_PATHS = 100000
+# 后台分析结果的轮询间隔（毫秒）
+POLL_INTERVAL = 50
+# 初始化对话框中同时显示的边输入行数
+EDITOR_ROWS = 15
+# 初始化对话框停止输入后多久同步左右两侧（毫秒）
+SYNC_DELAY = 300
+# 初始化对话框边列表允许的最大边数，更大的电路请从文件导入
+MAX_EDITOR_EDGES = 100000
+# 后台导入时每读取这么多条边报告一次进度，同时检查是否已取消
+IMPORT_PROGRESS_EDGES = 10000
+# 后台任务的进度提示，expanded 为 progress 回调收到的数值，found 为已找到的结果数
+ANALYSIS_PROGRESS = "分析中…… 已访问 {expanded} 个节点，已找到 {found} 条结果"
+IMPORT_PROGRESS = "正在导入…… 已读取 {expanded} 条边"
+EQUIVALENT_PROGRESS = "正在计算等效电阻…… 已迭代 {expanded} 次"
+
+
+# 结果列表只保存原始数据，行滚动到可见区域时才用这些函数转换为文字
+def format_path(path):
+    return " → ".join(path)
+
+
+def format_adjacency(row):
+    node, edges = row
+    return f"{node}: {edges}"
 
 
 class CircuitAnalyzerGUI:
@@ -8,6 +40,11 @@ class CircuitAnalyzerGUI:
         self.root = root
         self.root.title("电路分析器")
         self.graph = Graph()
+        # 每个事务（一次编辑或一批编辑、撤销、重做）之后刷新一次显示
+        self.graph.add_listener(self._graph_changed)
+        # 正在运行的后台分析的取消标志，空闲时为 None
+        self.job = None
+        self.operation_buttons = []
 
         # 创建主框架
         self.main_frame = ttk.Frame(root, padding="10")
@@ -16,6 +53,12 @@ class CircuitAnalyzerGUI:
         # 创建界面组件
         self.create_operation_section()
         self.create_display_section()
+        self.create_status_section()
+
+        # 关闭窗口时取消后台分析，避免它在退出过程中继续运行
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
 
         # 显示初始化对话框
         self.show_init_dialog()
@@ -55,144 +98,262 @@ class CircuitAnalyzerGUI:
         direct_input = tk.Text(right_frame, height=20, width=40)
         direct_input.pack(pady=5)
 
-        # 创建边输入区域的滚动框架
-        canvas = tk.Canvas(left_frame)
-        scrollbar = ttk.Scrollbar(left_frame, orient=tk.VERTICAL, command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas_frame = canvas.create_window((0, 0), window=scrollable_frame, anchor=tk.NW)
-
-        # 设置滚动区域的大小
-        canvas.bind("<Configure>", lambda e: canvas.itemconfig(canvas_frame, width=e.width))
-        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=5)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        edge_entries = []
-
-        def update_edge_inputs(*args):
-            """更新边输入框"""
-            for widget in scrollable_frame.winfo_children():
-                widget.destroy()
-            edge_entries.clear()
+        # 边列表：数据保存在 rows 中，界面上只有固定数量的输入行，滚动时改写它们的内容
+        rows = []
+        view = {"first": 0, "filling": False}
+        pending = {"rows": set(), "text_lines": set(), "full": False}
+        timers = {}
+
+        edges_frame = ttk.LabelFrame(left_frame, text="边列表")
+        edges_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        edges_frame.grid_columnconfigure(0, weight=1)
+        rows_frame = ttk.Frame(edges_frame)
+        rows_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N))
+
+        def on_scrollbar(action, amount, unit=None):
+            if action == "moveto":
+                view["first"] = int(float(amount) * len(rows))
+            elif unit == "pages":
+                view["first"] += int(amount) * EDITOR_ROWS
+            else:
+                view["first"] += int(amount)
+            refresh_rows()
 
+        def on_mousewheel(event):
+            if event.num == 4 or event.delta > 0:
+                on_scrollbar("scroll", -3)
+            else:
+                on_scrollbar("scroll", 3)
+            return "break"
+
+        scrollbar = ttk.Scrollbar(edges_frame, orient=tk.VERTICAL, command=on_scrollbar)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        editor = []
+        for slot in range(EDITOR_ROWS):
+            row_frame = ttk.Frame(rows_frame)
+            row_frame.pack(fill=tk.X, pady=2)
+
+            label = ttk.Label(row_frame, width=8)
+            label.pack(side=tk.LEFT, padx=2)
+            fields = []
+            for column, text in enumerate(("", "到", "电阻:")):
+                if text:
+                    ttk.Label(row_frame, text=text).pack(side=tk.LEFT, padx=2)
+                var = tk.StringVar()
+                entry = ttk.Entry(row_frame, width=10, textvariable=var)
+                entry.pack(side=tk.LEFT, padx=2)
+                var.trace_add("write", lambda *args, s=slot, c=column, v=var: row_edited(s, c, v))
+                entry.bind("<MouseWheel>", on_mousewheel)
+                entry.bind("<Button-4>", on_mousewheel)
+                entry.bind("<Button-5>", on_mousewheel)
+                fields.append((var, entry))
+            editor.append((label, fields))
+
+        def refresh_rows():
+            """把 rows 中当前可见的部分填入输入行"""
+            total = len(rows)
+            view["first"] = max(0, min(view["first"], total - EDITOR_ROWS))
+            first = view["first"]
+            view["filling"] = True
+            for slot, (label, fields) in enumerate(editor):
+                index = first + slot
+                if index < total:
+                    label.config(text=f"边 {index + 1}:")
+                    for (var, entry), value in zip(fields, rows[index]):
+                        entry.config(state=tk.NORMAL)
+                        var.set(value)
+                else:
+                    label.config(text="")
+                    for var, entry in fields:
+                        var.set("")
+                        entry.config(state=tk.DISABLED)
+            view["filling"] = False
+            if total:
+                scrollbar.set(first / total, min(total, first + EDITOR_ROWS) / total)
+            else:
+                scrollbar.set(0, 1)
+
+        def schedule(name, callback):
+            """停止输入 SYNC_DELAY 毫秒后再同步，连续输入只同步一次"""
+            if name in timers:
+                dialog.after_cancel(timers[name])
+            timers[name] = dialog.after(SYNC_DELAY, lambda: (timers.pop(name, None), callback()))
+
+        def flush(name, callback):
+            """立即执行还在等待的同步"""
+            timer = timers.pop(name, None)
+            if timer is not None:
+                dialog.after_cancel(timer)
+                callback()
+
+        def row_to_line(row):
+            return " ".join(value for value in row if value)
+
+        def line_to_row(line):
+            parts = line.split()
+            return (parts + ["", "", ""])[:3]
+
+        def header_line():
+            return f"{nodes.get().strip()} {edges.get().strip()}".strip()
+
+        def write_text_line(lineno, content):
+            """只改写右侧文本的第 lineno 行"""
+            last = int(direct_input.index("end-1c").split(".")[0])
+            if lineno > last:
+                direct_input.insert(tk.END, "\n" * (lineno - last))
+            direct_input.delete(f"{lineno}.0", f"{lineno}.end")
+            direct_input.insert(f"{lineno}.0", content)
+
+        def row_edited(slot, column, var):
+            """左侧某个输入框被修改：更新 rows，并只把这一行同步到右侧"""
+            if view["filling"]:
+                return
+            index = view["first"] + slot
+            if index >= len(rows):
+                return
+            rows[index][column] = var.get().strip()
+            pending["rows"].add(index)
+            schedule("to_text", sync_to_direct_input)
+
+        def sync_to_direct_input():
+            """从左侧输入行同步到右侧文本区域，只改写修改过的行"""
+            changed = sorted(pending["rows"])
+            pending["rows"].clear()
+            write_text_line(1, header_line())
+            for index in changed:
+                if index < len(rows):
+                    write_text_line(index + 2, row_to_line(rows[index]))
+
+        def rewrite_direct_input():
+            """按 rows 重写整个右侧文本（只在边数变化时使用）"""
+            lines = [header_line()]
+            lines.extend(row_to_line(row) for row in rows)
+            direct_input.delete(1.0, tk.END)
+            direct_input.insert(1.0, "\n".join(lines))
+
+        def resize_rows():
+            """边数输入变化：增减 rows 的长度，不创建任何控件"""
             try:
-                num_edges = int(edges.get()) if edges.get() else 0
-                if num_edges > 0:
-                    edges_frame = ttk.LabelFrame(scrollable_frame, text="边列表")
-                    edges_frame.pack(fill=tk.X, padx=5, pady=5)
-
-                    for i in range(num_edges):
-                        row_frame = ttk.Frame(edges_frame)
-                        row_frame.pack(fill=tk.X, pady=2)
-
-                        ttk.Label(row_frame, text=f"边 {i + 1}:").pack(side=tk.LEFT, padx=2)
-                        start = ttk.Entry(row_frame, width=10)
-                        start.pack(side=tk.LEFT, padx=2)
-                        ttk.Label(row_frame, text="到").pack(side=tk.LEFT, padx=2)
-                        end = ttk.Entry(row_frame, width=10)
-                        end.pack(side=tk.LEFT, padx=2)
-                        ttk.Label(row_frame, text="电阻:").pack(side=tk.LEFT, padx=2)
-                        resistance = ttk.Entry(row_frame, width=10)
-                        resistance.pack(side=tk.LEFT, padx=2)
-
-                        edge_entries.append((start, end, resistance))
-
-                        start.bind('<KeyRelease>', sync_to_direct_input)
-                        end.bind('<KeyRelease>', sync_to_direct_input)
-                        resistance.bind('<KeyRelease>', sync_to_direct_input)
-
+                count = int(edges.get()) if edges.get().strip() else 0
             except ValueError:
-                pass
-
-        def sync_to_direct_input(*args):
-            """从左侧输入框同步到右侧文本区域"""
-            try:
-                num_nodes = nodes.get().strip()
-                num_edges = edges.get().strip()
-                if num_nodes and num_edges:
-                    text = f"{num_nodes} {num_edges}\n"
-                    for start, end, resistance in edge_entries:
-                        if all([start.get(), end.get(), resistance.get()]):
-                            text += f"{start.get()} {end.get()} {resistance.get()}\n"
-                    direct_input.delete(1.0, tk.END)
-                    direct_input.insert(1.0, text)
-            except:
-                pass
-
-        def sync_from_direct_input(*args):
-            """从右侧文本区域同步到左侧输入框"""
-            try:
-                text = direct_input.get(1.0, tk.END).strip().split('\n')
-                if text and len(text) > 0:
-                    first_line = text[0].split()
-                    if len(first_line) == 2:
-                        nodes.delete(0, tk.END)
-                        edges.delete(0, tk.END)
-                        nodes.insert(0, first_line[0])
-                        edges.insert(0, first_line[1])
-                        update_edge_inputs()
-
-                        for i, line in enumerate(text[1:], 0):
-                            if i < len(edge_entries):
-                                parts = line.split()
-                                if len(parts) == 3:
-                                    start, end, res = edge_entries[i]
-                                    start.delete(0, tk.END)
-                                    end.delete(0, tk.END)
-                                    res.delete(0, tk.END)
-                                    start.insert(0, parts[0])
-                                    end.insert(0, parts[1])
-                                    res.insert(0, parts[2])
-            except:
-                pass
-
-        def validate_edges(*args):
-            """验证边数输入并触发更新"""
-            if edges.get().strip():
-                update_edge_inputs()
-                sync_to_direct_input()
+                return
+            if count < 0 or count > MAX_EDITOR_EDGES:
+                return
+            if count < len(rows):
+                del rows[count:]
+            else:
+                rows.extend(["", "", ""] for _ in range(count - len(rows)))
+            pending["rows"].clear()
+            rewrite_direct_input()
+            refresh_rows()
+
+        def text_edited(event=None):
+            # 记录光标所在行；粘贴、删除多行等操作在同步时按行数变化整体处理
+            lineno = int(direct_input.index(tk.INSERT).split(".")[0])
+            pending["text_lines"].add(lineno)
+            if event is not None and event.keysym in ("Return", "BackSpace", "Delete"):
+                pending["full"] = True
+            schedule("from_text", sync_from_direct_input)
+
+        def sync_from_direct_input():
+            """从右侧文本区域同步到左侧：行数不变时只解析修改过的行"""
+            lines = direct_input.get(1.0, "end-1c").split("\n")
+            changed = pending["text_lines"]
+            full = pending["full"] or len(lines) - 1 != len(rows)
+            pending["text_lines"] = set()
+            pending["full"] = False
+
+            first_line = lines[0].split()
+            if len(first_line) == 2:
+                nodes.delete(0, tk.END)
+                edges.delete(0, tk.END)
+                nodes.insert(0, first_line[0])
+                edges.insert(0, first_line[1])
+
+            if full:
+                rows[:] = [line_to_row(line) for line in lines[1:]]
+            else:
+                for lineno in changed:
+                    if 2 <= lineno <= len(lines):
+                        rows[lineno - 2] = line_to_row(lines[lineno - 1])
+            refresh_rows()
 
         # 绑定输入事件
-        edges.bind('<KeyRelease>', validate_edges)
-        edges.bind('<FocusOut>', validate_edges)
-        nodes.bind('<KeyRelease>', sync_to_direct_input)
-        direct_input.bind('<KeyRelease>', sync_from_direct_input)
+        edges.bind('<KeyRelease>', lambda e: schedule("resize", resize_rows))
+        nodes.bind('<KeyRelease>', lambda e: schedule("to_text", sync_to_direct_input))
+        direct_input.bind('<KeyRelease>', text_edited)
+        direct_input.bind('<<Paste>>', lambda e: pending.update(full=True))
+        refresh_rows()
 
         # 确认按钮框架
         button_frame = ttk.Frame(dialog)
         button_frame.pack(fill=tk.X, pady=10)
 
         def confirm():
+            # 左侧刚修改、尚未同步到右侧的内容先写入文本，再以文本为准解析
+            flush("resize", resize_rows)
+            flush("to_text", sync_to_direct_input)
             try:
                 input_text = direct_input.get(1.0, tk.END).strip()
-                lines = input_text.split('\n')
-
-                if not lines:
+                if not input_text:
                     raise ValueError("输入为空")
 
-                # 解析第一行
-                nodes_count, edges_count = map(int, lines[0].split())
+                # 先完整解析，有错误时不修改图
+                reader = NetlistReader(io.StringIO(input_text))
+                parsed_edges = list(reader)
+                if reader.error_count:
+                    raise ValueError(reader.error_summary())
 
-                # 解析边信息
-                for i in range(1, len(lines)):
-                    if lines[i].strip():
-                        start, end, resistance = lines[i].split()
-                        self.graph.add_edge(start, end, float(resistance))
-
-                self.update_display()
+                self.graph.add_edges(parsed_edges)
                 dialog.destroy()
 
             except (ValueError, IndexError) as e:
                 messagebox.showerror("错误", f"输入格式错误: {str(e)}")
 
+        def import_file():
+            """直接把网表文件流式加载到图中，不经过输入控件"""
+            path = filedialog.askopenfilename(parent=dialog, title="导入网表",
+                                              filetypes=[("网表文件", "*.txt *.net"), ("所有文件", "*")])
+            if not path:
+                return
+            dialog.destroy()
+            self.load_netlist(path)
+
+        ttk.Button(button_frame, text="从文件导入…", command=import_file).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="取消", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="确认", command=confirm).pack(side=tk.RIGHT, padx=5)
 
         # 等待对话框关闭
         self.root.wait_window(dialog)
 
+    def load_netlist(self, path):
+        """
+        在后台线程中把网表文件加载到当前图中
+
+        格式错误的行被跳过，加载完成后汇总提示。取消时已添加的边全部回滚。
+        """
+        graph = self.graph
+        reader = NetlistReader(path)
+
+        def task(emit, progress):
+            def edges():
+                # 定期调用 progress，取消时它抛出 SearchCancelled，add_edges 随即回滚整批
+                for count, edge in enumerate(reader, 1):
+                    if count % IMPORT_PROGRESS_EDGES == 0:
+                        progress(count)
+                    yield edge
+
+            return graph.add_edges(edges())
+
+        def on_finish(count):
+            self.update_display()
+            self.status_var.set(f"已导入 {count} 条边")
+            if reader.error_count:
+                messagebox.showwarning("导入警告", reader.error_summary())
+
+        self.run_analysis(task, on_finish=on_finish, status="正在导入……", progress_format=IMPORT_PROGRESS)
+
     def create_input_section(self):
         input_frame = ttk.LabelFrame(self.main_frame, text="添加边", padding="5")
         input_frame.grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
@@ -216,17 +377,27 @@ class CircuitAnalyzerGUI:
         op_frame.grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
 
         # 第一行：基本操作按钮
-        ttk.Button(op_frame, text="添加边", command=self.show_add_edge_dialog).grid(row=0, column=0, padx=5, pady=5)
-        ttk.Button(op_frame, text="删除边", command=self.show_delete_edge_dialog).grid(row=0, column=1, padx=5, pady=5)
-        ttk.Button(op_frame, text="删除节点", command=self.show_delete_node_dialog).grid(row=0, column=2, padx=5,
-                                                                                         pady=5)
+        buttons = [
+            ttk.Button(op_frame, text="添加边", command=self.show_add_edge_dialog),
+            ttk.Button(op_frame, text="删除边", command=self.show_delete_edge_dialog),
+            ttk.Button(op_frame, text="删除节点", command=self.show_delete_node_dialog),
+            ttk.Button(op_frame, text="撤销", command=self.undo),
+            ttk.Button(op_frame, text="重做", command=self.redo),
+        ]
+        for column, button in enumerate(buttons):
+            button.grid(row=0, column=column, padx=5, pady=5)
+        self.operation_buttons.extend(buttons)
 
         # 第二行：分析操作按钮
-        ttk.Button(op_frame, text="检测环路", command=self.detect_cycles).grid(row=1, column=0, padx=5, pady=5)
-        ttk.Button(op_frame, text="计算最短路径", command=self.show_shortest_path_dialog).grid(row=1, column=1, padx=5,
-                                                                                               pady=5)
-        ttk.Button(op_frame, text="显示所有路径", command=self.show_all_paths_dialog).grid(row=1, column=2, padx=5,
-                                                                                           pady=5)
+        buttons = [
+            ttk.Button(op_frame, text="检测环路", command=self.detect_cycles),
+            ttk.Button(op_frame, text="计算最短路径", command=self.show_shortest_path_dialog),
+            ttk.Button(op_frame, text="显示所有路径", command=self.show_all_paths_dialog),
+            ttk.Button(op_frame, text="等效电阻", command=self.show_equivalent_resistance_dialog),
+        ]
+        for column, button in enumerate(buttons):
+            button.grid(row=1, column=column, padx=5, pady=5)
+        self.operation_buttons.extend(buttons)
 
     def create_display_section(self):
         # 配置主框架的权重，使显示区域可以自适应
@@ -239,19 +410,125 @@ class CircuitAnalyzerGUI:
         display_frame.grid_columnconfigure(0, weight=1)
         display_frame.grid_rowconfigure(0, weight=1)
 
-        # 创建文本显示区域和滚动条
-        text_scroll = ttk.Scrollbar(display_frame)
-        text_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
-
-        self.text_display = tk.Text(display_frame, height=15, width=60)
-        self.text_display.grid(row=0, column=0, padx=5, pady=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # 结果列表只渲染可见行，结果再多也不会拖慢界面
+        self.results = ResultView(display_frame)
+        self.results.grid(row=0, column=0, padx=5, pady=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+    def create_status_section(self):
+        status_frame = ttk.Frame(self.main_frame, padding="5")
+        status_frame.grid(row=3, column=0, padx=5, sticky=(tk.W, tk.E))
+        status_frame.grid_columnconfigure(0, weight=1)
+
+        self.status_var = tk.StringVar(value="就绪")
+        ttk.Label(status_frame, textvariable=self.status_var).grid(row=0, column=0, sticky=tk.W)
+        self.cancel_button = ttk.Button(status_frame, text="取消分析", command=self.cancel_analysis,
+                                        state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=1, padx=5)
+
+    def run_analysis(self, task, on_items=None, on_finish=None, status="分析中……",
+                     progress_format=ANALYSIS_PROGRESS):
+        """
+        在后台线程中运行分析，避免阻塞 Tk 事件循环
+
+        参数:
+        task -- task(emit, progress)，在后台线程中执行；emit(item) 回传一条结果，
+                progress 作为进度回调传给 Graph 的搜索方法，返回值交给 on_finish
+        on_items -- on_items(items)，在主线程中分批接收 emit 的结果
+        on_finish -- on_finish(result)，任务正常结束后在主线程中调用
+        status -- 运行期间状态栏显示的文字
+        progress_format -- 收到进度后状态栏显示的文字，可使用 {expanded} 和 {found}
+        """
+        if self.job is not None:
+            messagebox.showwarning("提示", "已有分析正在运行")
+            return
+
+        cancel = threading.Event()
+        events = queue.Queue()
+
+        def progress(expanded):
+            if cancel.is_set():
+                raise SearchCancelled()
+            events.put(("progress", expanded))
+
+        def emit(item):
+            if cancel.is_set():
+                raise SearchCancelled()
+            events.put(("item", item))
+
+        def worker():
+            try:
+                result = task(emit, progress)
+                # 最后一个检查点之后才取消的任务同样丢弃结果，不再交给界面
+                events.put(("cancelled" if cancel.is_set() else "done", result))
+            except SearchCancelled:
+                events.put(("cancelled", None))
+            except Exception as e:
+                events.put(("error", e))
+
+        self.job = cancel
+        self.job_found = 0
+        for button in self.operation_buttons:
+            button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_var.set(status)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(POLL_INTERVAL, self._poll_analysis, events, on_items, on_finish, progress_format)
+
+    def _poll_analysis(self, events, on_items, on_finish, progress_format):
+        """取出后台线程的事件，更新进度并把结果分批交给界面"""
+        items = []
+        finished = None
+        expanded = None
+        try:
+            while finished is None:
+                kind, value = events.get_nowait()
+                if kind == "item":
+                    items.append(value)
+                elif kind == "progress":
+                    expanded = value
+                else:
+                    finished = (kind, value)
+        except queue.Empty:
+            pass
+
+        if items:
+            self.job_found += len(items)
+            if on_items:
+                on_items(items)
+        if expanded is not None:
+            self.status_var.set(progress_format.format(expanded=expanded, found=self.job_found))
+
+        if finished is None:
+            self.root.after(POLL_INTERVAL, self._poll_analysis, events, on_items, on_finish, progress_format)
+            return
+
+        self.job = None
+        for button in self.operation_buttons:
+            button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
+        kind, value = finished
+        if kind == "done":
+            self.status_var.set("完成")
+            if on_finish:
+                on_finish(value)
+        elif kind == "cancelled":
+            self.status_var.set(f"已取消，已找到 {self.job_found} 条结果")
+        else:
+            self.status_var.set("分析出错")
+            messagebox.showerror("错误", str(value))
 
-        # 连接滚动条和文本区域
-        self.text_display.config(yscrollcommand=text_scroll.set)
-        text_scroll.config(command=self.text_display.yview)
+    def close(self):
+        if self.job is not None:
+            self.job.set()
+        self.root.destroy()
 
-        # 设置文本区域字体
-        self.text_display.config(font=('Courier', 10))
+    def cancel_analysis(self):
+        """请求后台分析在下一个检查点停止"""
+        if self.job is not None:
+            self.job.set()
+            self.status_var.set("正在取消……")
 
     def add_edge(self):
         try:
@@ -264,22 +541,28 @@ class CircuitAnalyzerGUI:
                 return
 
             self.graph.add_edge(start, end, resistance)
-            self.update_display()
             self.clear_inputs()
         except ValueError:
             messagebox.showerror("错误", "电阻值必须为数字")
 
     def detect_cycles(self):
-        cycles = self.graph.detect_cycles()
-        self.text_display.delete(1.0, tk.END)
+        graph = self.graph
+        self.results.clear(formatter=format_path)
 
-        if not cycles:
-            self.text_display.insert(tk.END, "未检测到环路")
-        else:
-            self.text_display.insert(tk.END, "检测到以下非法环路：\n")
-            for i, cycle in enumerate(cycles, 1):
-                path_str = " → ".join(cycle)
-                self.text_display.insert(tk.END, f"环路 {i}: {path_str}\n")
+        def task(emit, progress):
+            for cycle in graph.iter_cycles(progress=progress):
+                emit(cycle)
+            return self.job_found
+
+        def on_items(cycles):
+            self.results.set_title("检测到以下非法环路：")
+            self.results.extend((cycle, None, len(cycle) - 1) for cycle in cycles)
+
+        def on_finish(count):
+            if not self.job_found:
+                self.results.set_message("未检测到环路")
+
+        self.run_analysis(task, on_items, on_finish)
 
     def show_shortest_path_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -294,19 +577,59 @@ class CircuitAnalyzerGUI:
         end.grid(row=0, column=3)
 
         def calculate():
-            result = self.graph.shortest_path(start.get(), end.get())
-            self.text_display.delete(1.0, tk.END)
-
-            if result:
-                resistance, path = result
-                self.text_display.insert(tk.END, f"从 {start.get()} 到 {end.get()} 的最短路径:\n")
-                self.text_display.insert(tk.END, f"路径: {' → '.join(path)}\n")
-                self.text_display.insert(tk.END, f"总电阻: {resistance}Ω")
-            else:
-                self.text_display.insert(tk.END, f"没有找到从 {start.get()} 到 {end.get()} 的路径")
+            start_node, end_node = start.get(), end.get()
+            graph = self.graph
+            self.results.clear()
+            dialog.destroy()
+
+            def task(emit, progress):
+                return graph.shortest_path(start_node, end_node, progress=progress)
+
+            def on_finish(result):
+                if result:
+                    resistance, path = result
+                    self.results.set_title(f"从 {start_node} 到 {end_node} 的最短路径:")
+                    self.results.set_message(f"总电阻: {resistance}Ω")
+                    self.results.extend([(" → ".join(path), resistance, len(path) - 1)])
+                else:
+                    self.results.set_message(f"没有找到从 {start_node} 到 {end_node} 的路径")
+
+            self.run_analysis(task, on_finish=on_finish)
+
+        ttk.Button(dialog, text="计算", command=calculate).grid(row=1, column=0, columnspan=4, pady=10)
+
+    def show_equivalent_resistance_dialog(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("计算等效电阻")
+
+        ttk.Label(dialog, text="节点 A:").grid(row=0, column=0)
+        start = ttk.Entry(dialog, width=10)
+        start.grid(row=0, column=1)
+
+        ttk.Label(dialog, text="节点 B:").grid(row=0, column=2)
+        end = ttk.Entry(dialog, width=10)
+        end.grid(row=0, column=3)
 
+        def calculate():
+            node_a, node_b = start.get(), end.get()
+            graph = self.graph
+            self.results.clear()
             dialog.destroy()
 
+            def task(emit, progress):
+                # 求解线性方程组，大电路上可能耗时较长；取消后由 progress 中止，出错时由 run_analysis 弹出提示
+                return graph.equivalent_resistance(node_a, node_b, progress=progress)
+
+            def on_finish(resistance):
+                if resistance is None:
+                    self.results.set_message(f"节点 {node_a} 或 {node_b} 不存在")
+                elif resistance == float("inf"):
+                    self.results.set_message(f"{node_a} 与 {node_b} 之间不连通")
+                else:
+                    self.results.set_message(f"{node_a} 与 {node_b} 之间的等效电阻: {resistance:.6g}Ω")
+
+            self.run_analysis(task, on_finish=on_finish, progress_format=EQUIVALENT_PROGRESS)
+
         ttk.Button(dialog, text="计算", command=calculate).grid(row=1, column=0, columnspan=4, pady=10)
 
     def show_delete_node_dialog(self):
@@ -323,7 +646,6 @@ class CircuitAnalyzerGUI:
             node = node_entry.get().strip()
             if node:
                 self.graph.delete_node(node)
-                self.update_display()
                 dialog.destroy()
             else:
                 messagebox.showerror("错误", "请输入节点名称")
@@ -354,7 +676,6 @@ class CircuitAnalyzerGUI:
             end = end_entry.get().strip()
             if start and end:
                 self.graph.delete_edge(start, end)
-                self.update_display()
                 dialog.destroy()
             else:
                 messagebox.showerror("错误", "请输入起点和终点")
@@ -400,7 +721,6 @@ class CircuitAnalyzerGUI:
                     return
 
                 self.graph.add_edge(start, end, float(resistance))
-                self.update_display()
                 dialog.destroy()
 
             except ValueError:
@@ -424,27 +744,66 @@ class CircuitAnalyzerGUI:
         end = ttk.Entry(dialog, width=10)
         end.grid(row=0, column=3)
 
-        def calculate():
-            paths = self.graph.all_paths_simulation(start.get(), end.get())
-            self.text_display.delete(1.0, tk.END)
+        ttk.Label(dialog, text="最多显示:").grid(row=1, column=0)
+        limit = ttk.Entry(dialog, width=10)
+        limit.insert(0, str(MAX_DISPLAY_PATHS))
+        limit.grid(row=1, column=1)
 
-            if not paths:
-                self.text_display.insert(tk.END, f"没有找到从 {start.get()} 到 {end.get()} 的路径")
-            else:
-                self.text_display.insert(tk.END, f"从 {start.get()} 到 {end.get()} 的所有可能路径:\n")
-                for path, resistance in paths:
-                    path_str = " → ".join(path)
-                    self.text_display.insert(tk.END, f"{path_str} ({resistance}Ω)\n")
+        def calculate():
+            try:
+                max_paths = int(limit.get())
+            except ValueError:
+                messagebox.showerror("错误", "最多显示的路径数必须为整数")
+                return
 
+            start_node, end_node = start.get(), end.get()
+            graph = self.graph
+            self.results.clear(formatter=format_path)
             dialog.destroy()
 
-        ttk.Button(dialog, text="显示", command=calculate).grid(row=1, column=0, columnspan=4, pady=10)
+            def task(emit, progress):
+                # 多取一条用于判断结果是否被截断
+                paths = graph.iter_paths(start_node, end_node, max_paths=max_paths + 1, progress=progress)
+                for i, item in enumerate(paths):
+                    if i == max_paths:
+                        return True
+                    emit(item)
+                return False
+
+            def on_items(paths):
+                self.results.set_title(f"从 {start_node} 到 {end_node} 的所有可能路径:")
+                self.results.extend((path, resistance, len(path) - 1) for path, resistance in paths)
+
+            def on_finish(truncated):
+                if not self.job_found:
+                    self.results.set_message(f"没有找到从 {start_node} 到 {end_node} 的路径")
+                elif truncated:
+                    self.results.set_message(f"……仅显示前 {max_paths} 条路径")
+
+            self.run_analysis(task, on_items, on_finish)
+
+        ttk.Button(dialog, text="显示", command=calculate).grid(row=2, column=0, columnspan=4, pady=10)
+
+    def undo(self):
+        if self.job is not None:
+            return
+        if not self.graph.undo():
+            self.status_var.set("没有可撤销的修改")
+
+    def redo(self):
+        if self.job is not None:
+            return
+        if not self.graph.redo():
+            self.status_var.set("没有可重做的修改")
+
+    def _graph_changed(self, changes):
+        # 后台导入在工作线程中提交，不能在那里操作控件，由其 on_finish 刷新
+        if threading.current_thread() is threading.main_thread():
+            self.update_display()
 
     def update_display(self):
-        self.text_display.delete(1.0, tk.END)
-        self.text_display.insert(tk.END, "当前电路结构:\n")
-        for node, edges in self.graph.adj_list.items():
-            self.text_display.insert(tk.END, f"{node}: {edges}\n")
+        self.results.clear("当前电路结构:", formatter=format_adjacency)
+        self.results.extend((row, None, len(row[1])) for row in self.graph.adj_list.items())
 
     def clear_inputs(self):
         self.start_var.set("")
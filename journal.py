@@ -0,0 +1,88 @@
+"""
+修改日志与撤销/重做
+
+Graph 的每个基本修改都以一个元组追加到日志末尾，记录足以撤销该修改的旧值：
+("node+", 节点) -- 新增节点
+("edge", 起点, 终点, 旧电阻值或 None, 新电阻值) -- 新增或修改边
+("edge-", 起点, 终点, 电阻值) -- 删除边
+("node-", 节点, {后继: 电阻值}, {前驱: 电阻值}) -- 删除节点及其出边、入边
+("edges+", [新节点], [起点], [终点], [电阻值], {序号: 旧电阻值}) -- 一次批量添加（add_edges）
+("edges-", ...) -- 撤销后的批量添加，字段同上，重做时按原顺序重新添加
+
+批量添加不逐边记录，一条记录只为每条边多保存三个引用，导入大网表时日志的内存
+与耗时都很小；被覆盖的旧电阻值只在确实覆盖已有的边时才按边的序号保存。
+
+一个事务（一次编辑，或 with graph.batch() 中的全部编辑）对应日志中的一段 [begin, end)。
+撤销时按逆序应用这一段的逆操作，逆操作本身也追加到日志中，形成新的一段放入重做栈；
+重做同理。因此撤销、重做的代价只与这一段的长度有关，不需要复制整个图。
+
+设置 max_transactions 后只保留最近的这么多个可撤销事务：更早的事务在提交时被丢弃，
+不再被任何事务引用的记录从日志开头删除，其余区间随之平移，长期运行时日志的
+内存不会无限增长。
+"""
+
+
+class ChangeJournal:
+    def __init__(self, max_transactions=None):
+        """
+        参数:
+        max_transactions -- 最多保留的可撤销事务数，None 表示不限
+        """
+        self.max_transactions = max_transactions
+        self.records = []
+        # 可撤销 / 可重做的事务，元素为日志区间 (begin, end)
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, record):
+        self.records.append(record)
+
+    def commit(self, begin):
+        """
+        把 begin 之后的记录作为一个新事务提交，并清空重做栈
+
+        返回:
+        提交的记录列表；没有记录时返回空列表，不产生事务
+        """
+        if len(self.records) == begin:
+            return []
+        self.undo_stack.append((begin, len(self.records)))
+        self.redo_stack.clear()
+        return self.records[begin:]
+
+    def segment(self, span):
+        """按逆序返回区间内的记录，供撤销或重做逐条应用逆操作"""
+        begin, end = span
+        return self.records[end - 1:begin - 1 if begin else None:-1]
+
+    def truncate(self, begin):
+        """丢弃 begin 之后的记录（回滚未提交的事务）"""
+        del self.records[begin:]
+
+    def trim(self):
+        """
+        按 max_transactions 丢弃最早的可撤销事务，并删除日志开头不再被引用的记录
+
+        只能在没有未提交事务时调用（未提交事务的 begin 会因平移而失效）。
+        """
+        limit = self.max_transactions
+        if limit is not None and len(self.undo_stack) > limit:
+            del self.undo_stack[:len(self.undo_stack) - limit]
+        spans = self.undo_stack + self.redo_stack
+        if not spans:
+            self.records.clear()
+            return
+        offset = min(begin for begin, _ in spans)
+        if not offset:
+            return
+        del self.records[:offset]
+        self.undo_stack[:] = [(begin - offset, end - offset) for begin, end in self.undo_stack]
+        self.redo_stack[:] = [(begin - offset, end - offset) for begin, end in self.redo_stack]
+
+    def clear(self):
+        self.records.clear()
+        self.undo_stack.clear()
+        self.redo_stack.clear()
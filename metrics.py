@@ -0,0 +1,115 @@
+"""
+搜索算法的运行统计
+
+默认关闭。调用 Graph.enable_metrics() 后，shortest_path、k_shortest_paths、
+iter_paths（以及 all_paths_simulation）、iter_cycles（以及 detect_cycles）
+每次调用结束时生成一个 SearchStats，保存在 graph.last_stats 中，
+并累加到 MetricsRegistry。
+
+关闭时搜索循环只维护几个局部整数计数器，调用结束时多一次 None 判断，
+不会为每个节点或每条边调用任何函数。
+"""
+import json
+import time
+from contextlib import contextmanager
+
+# SearchStats 中可累加的计数器
+COUNTERS = (
+    "nodes_expanded",
+    "edges_relaxed",
+    "heap_pushes",
+    "stale_pops",
+    "paths_found",
+    "paths_pruned",
+    "cycles_found",
+)
+
+
+class SearchStats:
+    """
+    一次调用的统计
+
+    nodes_expanded -- 扩展（出堆或入栈）的节点数
+    edges_relaxed -- 检查过的出边数（最短路径搜索）
+    heap_pushes / stale_pops -- 入堆次数 / 弹出的过期堆项数
+    max_depth -- 回溯搜索中当前路径的最大节点数
+    paths_found / paths_pruned -- 找到的路径数 / 被剪掉的分支数（全路径搜索）
+    cycles_found -- 找到的环路数
+    phases -- {阶段名: 秒数}
+    wall_time -- 整个调用的耗时（秒）；生成器从创建到结束，包括调用方处理结果的时间
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.max_depth = 0
+        self.phases = {}
+        self.wall_time = 0.0
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """统计一个阶段的耗时，同名阶段累加"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - begin
+
+    def add_heap(self, expanded, relaxed, pushes, stale):
+        """累加一次堆搜索的计数"""
+        self.nodes_expanded += expanded
+        self.edges_relaxed += relaxed
+        self.heap_pushes += pushes
+        self.stale_pops += stale
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self._started
+
+    def as_dict(self):
+        result = {"operation": self.operation}
+        for name in COUNTERS:
+            result[name] = getattr(self, name)
+        result["max_depth"] = self.max_depth
+        result["phases"] = dict(self.phases)
+        result["wall_time"] = self.wall_time
+        return result
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)}" for name in COUNTERS + ("max_depth",)
+                           if getattr(self, name))
+        return f"SearchStats({self.operation}: {fields}, wall_time={self.wall_time:.6f})"
+
+
+class MetricsRegistry:
+    """按操作名累计所有调用的统计"""
+
+    def __init__(self):
+        self.operations = {}
+
+    def record(self, stats):
+        entry = self.operations.get(stats.operation)
+        if entry is None:
+            entry = self.operations[stats.operation] = {name: 0 for name in COUNTERS}
+            entry.update(calls=0, max_depth=0, wall_time=0.0, phases={})
+        entry["calls"] += 1
+        for name in COUNTERS:
+            entry[name] += getattr(stats, name)
+        entry["max_depth"] = max(entry["max_depth"], stats.max_depth)
+        entry["wall_time"] += stats.wall_time
+        phases = entry["phases"]
+        for name, seconds in stats.phases.items():
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    def reset(self):
+        self.operations.clear()
+
+    def as_dict(self):
+        """返回 {操作名: 累计统计} 的副本"""
+        return {operation: dict(entry, phases=dict(entry["phases"]))
+                for operation, entry in self.operations.items()}
+
+    def dump(self, fp):
+        """把累计统计以 JSON 格式写入文件对象"""
+        json.dump(self.as_dict(), fp, indent=2, ensure_ascii=False)
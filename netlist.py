@@ -0,0 +1,135 @@
+"""
+网表文件的流式解析
+
+网表为文本格式，每行一条边："起点 终点 电阻值"。
+第一行可以是 "节点数 边数" 的头部（与命令行、GUI 的输入格式相同），
+空行和以 # 开头的注释行会被跳过。
+"""
+import codecs
+
+# 每次从文件读取的字符数
+CHUNK_SIZE = 1 << 20
+# 最多保留的错误行样本数
+MAX_ERROR_SAMPLES = 100
+
+
+class NetlistReader:
+    """
+    按块读取网表，逐条产生 (起点, 终点, 电阻值)
+
+    整个文件不会一次性读入内存。格式错误的行不会中断读取，
+    而是被记录下来，读取结束后通过 errors / error_count 统一查看。
+
+    用法:
+    reader = NetlistReader("circuit.txt")
+    graph.add_edges(reader)
+    if reader.error_count:
+        print(reader.error_summary())
+    """
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        """
+        参数:
+        source -- 文件路径，或可 read() 的文件对象（文本或二进制均可）
+        chunk_size -- 每次读取的字符数
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.header = None
+        self.errors = []
+        self.error_count = 0
+
+    def __iter__(self):
+        if hasattr(self.source, "read"):
+            yield from self._parse(self.source)
+        else:
+            with open(self.source, encoding="utf-8") as f:
+                yield from self._parse(f)
+
+    def _chunks(self, f):
+        """按块读取文件内容，二进制文件按 UTF-8 增量解码"""
+        decoder = None
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, bytes):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder("utf-8")()
+                chunk = decoder.decode(chunk)
+            yield chunk
+        if decoder is not None:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+    def _parse(self, f):
+        line_no = 0
+        carry = ""
+        first = True
+
+        for chunk in self._chunks(f):
+            lines = (carry + chunk).split("\n")
+            # 最后一行可能不完整，留到下一块
+            carry = lines.pop()
+            for line in lines:
+                line_no += 1
+                parts = line.split()
+                if not parts or parts[0].startswith("#"):
+                    continue
+                if first:
+                    first = False
+                    if self._parse_header(parts):
+                        continue
+                # 常见情况直接处理，避免每行一次方法调用
+                if len(parts) == 3:
+                    try:
+                        yield parts[0], parts[1], float(parts[2])
+                        continue
+                    except ValueError:
+                        pass
+                self._error(line_no, line)
+
+        if carry:
+            line_no += 1
+            parts = carry.split()
+            if parts and not parts[0].startswith("#"):
+                if not (first and self._parse_header(parts)):
+                    edge = self._parse_edge(parts, line_no, carry)
+                    if edge is not None:
+                        yield edge
+
+    def _parse_header(self, parts):
+        """识别 "节点数 边数" 头部"""
+        if len(parts) != 2:
+            return False
+        try:
+            self.header = (int(parts[0]), int(parts[1]))
+        except ValueError:
+            return False
+        return True
+
+    def _parse_edge(self, parts, line_no, line):
+        if len(parts) == 3:
+            try:
+                return parts[0], parts[1], float(parts[2])
+            except ValueError:
+                pass
+        self._error(line_no, line)
+        return None
+
+    def _error(self, line_no, line):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append((line_no, line.strip()))
+
+    def error_summary(self):
+        """返回格式错误行的汇总说明"""
+        if not self.error_count:
+            return ""
+        lines = [f"共有 {self.error_count} 行格式错误，应为：起点 终点 电阻值"]
+        for line_no, line in self.errors:
+            lines.append(f"  第 {line_no} 行：{line}")
+        if self.error_count > len(self.errors):
+            lines.append(f"  ……另有 {self.error_count - len(self.errors)} 行未列出")
+        return "\n".join(lines)
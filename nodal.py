@@ -0,0 +1,261 @@
+"""
+节点分析法求两点间的等效电阻
+
+把电路看作电阻网络：adj_list 中的每条边 start → end（电阻 R）都是连接两个节点的
+一个电阻，方向不影响物理意义；同一对节点之间的多条边按并联处理，自环没有作用。
+由各电阻的电导 1/R 组成拉普拉斯矩阵 L，把每个连通分量中的一个节点接地后，
+从 a 注入 1A、从 b 流出 1A，解 L x = e_a - e_b，两点的电位差 x_a - x_b 就是等效电阻。
+
+安装了 SciPy 时对稀疏矩阵做一次 LU 分解，之后每个节点对只需一次回代；
+否则在两点所在的连通分量上用 Jacobi 预条件共轭梯度法求解。
+电阻为 0 的边视为短路，两端节点合并为同一个节点；负电阻会被拒绝。
+"""
+from math import inf, sqrt
+
+try:
+    import numpy
+    from scipy.sparse import csc_matrix
+    from scipy.sparse.linalg import splu
+except ImportError:
+    numpy = None
+
+# 共轭梯度法的默认相对残差和最大迭代次数
+DEFAULT_TOLERANCE = 1e-10
+MAX_ITERATIONS = 10000
+
+
+class EquivalentResistanceSolver:
+    """
+    对一个电路准备好一次，之后可以回答任意多个节点对的等效电阻
+
+    构建后图被修改不会自动反映到求解器中，需要重新构建。
+    """
+
+    def __init__(self, graph, tolerance=DEFAULT_TOLERANCE, progress=None):
+        """
+        参数:
+        graph -- Graph
+        tolerance -- 共轭梯度法的相对残差要求（使用 SciPy 时不需要）
+        progress -- 可选的进度回调 progress(已完成的迭代次数)，建立矩阵之后以 0 调用一次，
+                    共轭梯度法每次迭代前再调用；回调抛出的异常（例如取消）会中止求解
+        """
+        self.tolerance = tolerance
+        self.progress = progress
+        adj_list = graph.adj_list
+
+        # 并查集合并短路（电阻为 0）的节点
+        parent = {node: node for node in adj_list}
+
+        def find(node):
+            root = node
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node] != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        for node, edges in adj_list.items():
+            for neighbor, resistance in edges.items():
+                if resistance < 0:
+                    raise ValueError(f"边 {node} → {neighbor} 的电阻为负数：{resistance}")
+                if resistance == 0:
+                    parent[find(node)] = find(neighbor)
+        self.representative = {node: find(node) for node in adj_list}
+
+        # 累加各节点对之间的电导（并联电阻的电导相加）
+        conductance = {}
+        for node, edges in adj_list.items():
+            a = self.representative[node]
+            for neighbor, resistance in edges.items():
+                b = self.representative[neighbor]
+                if a == b or resistance == inf:
+                    continue
+                g = 1.0 / resistance
+                row_a = conductance.setdefault(a, {})
+                row_a[b] = row_a.get(b, 0.0) + g
+                row_b = conductance.setdefault(b, {})
+                row_b[a] = row_b.get(a, 0.0) + g
+
+        # 划分连通分量，每个分量的第一个节点接地，其余节点为未知量
+        self.component = {}
+        self._unknowns = []
+        self._local = {}
+        for root in dict.fromkeys(self.representative.values()):
+            if root in self.component:
+                continue
+            component_id = len(self._unknowns)
+            members = []
+            self.component[root] = component_id
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                for neighbor in conductance.get(node, ()):
+                    if neighbor not in self.component:
+                        self.component[neighbor] = component_id
+                        self._local[neighbor] = len(members)
+                        members.append(neighbor)
+                        stack.append(neighbor)
+            self._unknowns.append(members)
+
+        # 每个分量的约化拉普拉斯矩阵：对角线与非对角元（接地节点已去掉）
+        self._diagonal = []
+        self._rows = []
+        for members in self._unknowns:
+            diagonal = []
+            rows = []
+            for node in members:
+                row = conductance[node]
+                diagonal.append(sum(row.values()))
+                rows.append([(self._local[neighbor], g) for neighbor, g in row.items()
+                             if neighbor in self._local])
+            self._diagonal.append(diagonal)
+            self._rows.append(rows)
+
+        self._factor = None
+        self._offset = None
+        if progress is not None:
+            progress(0)
+        if numpy is not None:
+            self._factorize()
+
+    def _factorize(self):
+        """把所有分量拼成一个块对角稀疏矩阵并做 LU 分解"""
+        self._offset = []
+        data, row_index, col_index = [], [], []
+        size = 0
+        for diagonal, rows in zip(self._diagonal, self._rows):
+            self._offset.append(size)
+            for i, (d, row) in enumerate(zip(diagonal, rows)):
+                data.append(d)
+                row_index.append(size + i)
+                col_index.append(size + i)
+                for j, g in row:
+                    data.append(-g)
+                    row_index.append(size + i)
+                    col_index.append(size + j)
+            size += len(diagonal)
+        if size:
+            matrix = csc_matrix((data, (row_index, col_index)), shape=(size, size))
+            self._factor = splu(matrix)
+            self._size = size
+
+    def _locate(self, a, b):
+        """返回 (a 代表, b 代表)，两点短路时返回 0，不连通时返回 inf"""
+        ra = self.representative[a]
+        rb = self.representative[b]
+        if ra == rb:
+            return 0.0
+        if self.component[ra] != self.component[rb]:
+            return inf
+        return ra, rb
+
+    def resistance(self, a, b):
+        """
+        返回 a、b 两点间的等效电阻
+
+        返回:
+        等效电阻值；两点不连通时为 inf；节点不存在时抛出 KeyError
+        """
+        return self.resistances([(a, b)])[0]
+
+    def resistances(self, pairs):
+        """
+        批量计算多个节点对的等效电阻
+
+        使用 SciPy 时所有节点对共享一次分解，一次回代求解全部右端项。
+
+        参数:
+        pairs -- 可迭代的 (a, b) 序列
+
+        返回:
+        与输入顺序一致的等效电阻列表
+        """
+        pairs = list(pairs)
+        results = [None] * len(pairs)
+        pending = []
+        for i, (a, b) in enumerate(pairs):
+            located = self._locate(a, b)
+            if isinstance(located, tuple):
+                pending.append((i, located))
+            else:
+                results[i] = located
+
+        if not pending:
+            return results
+
+        if self._factor is not None:
+            rhs = numpy.zeros((self._size, len(pending)))
+            positions = []
+            for column, (_, (ra, rb)) in enumerate(pending):
+                pa = self._position(ra)
+                pb = self._position(rb)
+                if pa is not None:
+                    rhs[pa, column] += 1.0
+                if pb is not None:
+                    rhs[pb, column] -= 1.0
+                positions.append((pa, pb))
+            solution = self._factor.solve(rhs)
+            for column, (i, _) in enumerate(pending):
+                pa, pb = positions[column]
+                xa = solution[pa, column] if pa is not None else 0.0
+                xb = solution[pb, column] if pb is not None else 0.0
+                results[i] = float(xa - xb)
+        else:
+            for i, (ra, rb) in pending:
+                results[i] = self._conjugate_gradient(ra, rb)
+
+        return results
+
+    def _position(self, node):
+        """节点在全局未知量中的位置，接地节点返回 None"""
+        local = self._local.get(node)
+        if local is None:
+            return None
+        return self._offset[self.component[node]] + local
+
+    def _conjugate_gradient(self, ra, rb):
+        """在两点所在分量上用 Jacobi 预条件共轭梯度法求电位差"""
+        component_id = self.component[ra]
+        diagonal = self._diagonal[component_id]
+        rows = self._rows[component_id]
+        size = len(diagonal)
+
+        b = [0.0] * size
+        la = self._local.get(ra)
+        lb = self._local.get(rb)
+        if la is not None:
+            b[la] += 1.0
+        if lb is not None:
+            b[lb] -= 1.0
+
+        def multiply(vector):
+            return [diagonal[i] * vector[i] - sum(g * vector[j] for j, g in rows[i])
+                    for i in range(size)]
+
+        x = [0.0] * size
+        r = b[:]
+        z = [r[i] / diagonal[i] for i in range(size)]
+        p = z[:]
+        rz = sum(r[i] * z[i] for i in range(size))
+        threshold = self.tolerance * sqrt(sum(v * v for v in b))
+
+        progress = self.progress
+        for iteration in range(MAX_ITERATIONS):
+            if progress is not None:
+                progress(iteration)
+            ap = multiply(p)
+            alpha = rz / sum(p[i] * ap[i] for i in range(size))
+            for i in range(size):
+                x[i] += alpha * p[i]
+                r[i] -= alpha * ap[i]
+            if sqrt(sum(v * v for v in r)) <= threshold:
+                break
+            z = [r[i] / diagonal[i] for i in range(size)]
+            rz_next = sum(r[i] * z[i] for i in range(size))
+            beta = rz_next / rz
+            rz = rz_next
+            p = [z[i] + beta * p[i] for i in range(size)]
+
+        xa = x[la] if la is not None else 0.0
+        xb = x[lb] if lb is not None else 0.0
+        return xa - xb
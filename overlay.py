@@ -0,0 +1,147 @@
+"""
+写时复制的邻接表
+
+Graph.fork() 用它让父图和分支共享未修改的邻接行：OverlayMap 把自己的修改保存在
+local 中，删除的键记在 removed 中，其余的键直接读取只读的 base。
+写入一行之前先调用 own() 把这一行复制到 local，因此每个分支额外占用的内存只与
+它修改过的行数成正比。
+
+base 中的行被多个图共享，任何时候都不能原地修改；OverlayMap 作为 base 时同样视为只读。
+"""
+from collections.abc import MutableMapping
+
+# 叠加层数达到这个值时，fork() 先把各层合并（只复制外层字典，行仍然共享），
+# 避免多次分支之后每次查找都要逐层向下
+MAX_DEPTH = 8
+# 合并时，各层累计的修改不超过最底层字典的这个比例就只合并修改、保留最底层，
+# 超过时才整体复制；因此反复分支时整体复制的代价分摊到足够多的修改上
+COMPACT_RATIO = 0.25
+
+
+class OverlayMap(MutableMapping):
+    def __init__(self, base):
+        """
+        参数:
+        base -- 只读的字典或 OverlayMap
+        """
+        self.base = base
+        self.local = {}
+        self.removed = set()
+        self._len = len(base)
+        self.depth = base.depth + 1 if isinstance(base, OverlayMap) else 1
+
+    def __getitem__(self, key):
+        row = self.local.get(key)
+        if row is not None:
+            return row
+        if key in self.removed:
+            raise KeyError(key)
+        return self.base[key]
+
+    def get(self, key, default=None):
+        row = self.local.get(key)
+        if row is not None:
+            return row
+        if key in self.removed:
+            return default
+        return self.base.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.local or (key not in self.removed and key in self.base)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._len += 1
+        self.local[key] = value
+        self.removed.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.local.pop(key, None)
+        if key in self.base:
+            self.removed.add(key)
+        self._len -= 1
+
+    def __iter__(self):
+        local = self.local
+        removed = self.removed
+        yield from local
+        for key in self.base:
+            if key not in local and key not in removed:
+                yield key
+
+    def __len__(self):
+        return self._len
+
+    def own(self, key):
+        """返回可以原地修改的一行，第一次写入时从 base 复制"""
+        row = self.local.get(key)
+        if row is None:
+            row = self.local[key] = dict(self[key])
+        return row
+
+    def is_modified(self):
+        return bool(self.local or self.removed)
+
+    def compact(self):
+        """
+        把所有层合并为最底层字典上的一层，返回新的 OverlayMap，内容与自身相同
+
+        只合并各层的 local 与 removed，代价与累计的修改量成正比，不复制最底层字典。
+        """
+        layers = []
+        table = self
+        while isinstance(table, OverlayMap):
+            layers.append(table)
+            table = table.base
+        merged = OverlayMap(table)
+        local = merged.local
+        removed = merged.removed
+        for layer in reversed(layers):
+            for key in layer.removed:
+                local.pop(key, None)
+                if key in table:
+                    removed.add(key)
+            local.update(layer.local)
+            removed.difference_update(layer.local)
+        merged._len = self._len
+        return merged
+
+    def flatten(self):
+        """
+        合并所有层，返回普通字典；行对象与各层共享，同样只读
+
+        先整体复制最底层的字典，再自下而上应用各层的删除与修改，
+        复制和合并都在字典的 C 实现中完成，代价主要是一次外层字典复制。
+        """
+        layers = []
+        table = self
+        while isinstance(table, OverlayMap):
+            layers.append(table)
+            table = table.base
+        merged = dict(table)
+        for layer in reversed(layers):
+            for key in layer.removed:
+                merged.pop(key, None)
+            merged.update(layer.local)
+        return merged
+
+
+def shared_base(table):
+    """
+    把 table 冻结为可以被多个 OverlayMap 共享的 base
+
+    没有修改过的叠加层直接复用它的 base，层数过多时合并，
+    所以从同一个图反复分支不会让层数增长。累计修改较少时只合并修改（见 compact），
+    长时间边修改边分支也不会每隔几次分支就复制整个表。
+    """
+    if isinstance(table, OverlayMap):
+        if not table.is_modified():
+            return table.base
+        if table.depth >= MAX_DEPTH:
+            merged = table.compact()
+            if len(merged.local) + len(merged.removed) > len(merged.base) * COMPACT_RATIO:
+                return merged.flatten()
+            return merged
+    return table
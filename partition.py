@@ -0,0 +1,490 @@
+"""
+图划分与分片分析
+
+一张电路大到不适合放在一个进程的 adj_list 中时，先把它划分为 k 个规模接近、
+割边尽量少的部分，每部分写成一个分片：
+
+    manifest.json         分片列表
+    part-<i>.snap         该部分内部的边，格式同 snapshot 模块
+    part-<i>.json         边界表：本部分的边界节点，以及从本部分指向其他部分的割边
+
+边界节点是割边的端点。ShardedGraph 为每个分片启动一个独立的工作进程，
+工作进程只打开自己的分片；协调进程只持有边界表。
+
+环路检测：各分片先求内部的强连通分量，再在边界节点上建立摘要图
+（同一分片内边界节点之间的可达关系加上割边）。摘要图中跨分片的强连通分量
+决定哪些局部分量需要合并：分片内既能从该分量的边界节点到达、又能到达该分量
+边界节点的节点，都属于合并后的分量。
+
+最短路径：各分片预先计算边界节点之间的分片内最短距离，与割边组成覆盖图；
+查询时只需在起点、终点所在的分片中各做一次 Dijkstra，再在覆盖图上搜索，
+最后由各分片展开每一段路径。
+"""
+import json
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+from math import inf
+
+from compact import CompactGraph
+from cycles import strongly_connected_components, cyclic_components
+from results import ShortestPath
+from snapshot import open_snapshot, save_snapshot
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+# 默认允许各部分的节点数超过平均值的比例
+DEFAULT_IMBALANCE = 0.03
+DEFAULT_ROUNDS = 10
+
+
+def _bfs_order(graph):
+    """按无向广度优先顺序排列所有节点，相邻节点在序列中也尽量靠近"""
+    adj_list = graph.adj_list
+    reverse_adj_list = graph.reverse_adj_list
+    seen = set()
+    order = []
+    for root in adj_list:
+        if root in seen:
+            continue
+        seen.add(root)
+        head = len(order)
+        order.append(root)
+        while head < len(order):
+            node = order[head]
+            head += 1
+            for neighbor in adj_list[node]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    order.append(neighbor)
+            for neighbor in reverse_adj_list[node]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    order.append(neighbor)
+    return order
+
+
+def partition_graph(graph, k, imbalance=DEFAULT_IMBALANCE, rounds=DEFAULT_ROUNDS, seed=0):
+    """
+    把图划分为 k 个部分（带容量限制的标签传播）
+
+    先按广度优先顺序切成 k 段作为初始划分，然后反复让每个节点移动到其邻居
+    （不分方向）最多的部分，移动后目标部分的节点数不能超过容量上限。
+
+    参数:
+    graph -- Graph
+    k -- 部分数，超过节点数时按节点数计
+    imbalance -- 各部分节点数允许超过平均值的比例
+    rounds -- 最多迭代的轮数，某一轮没有节点移动时提前结束
+    seed -- 随机种子，决定每轮访问节点的顺序
+
+    返回:
+    {节点: 部分编号}，编号为 0..k-1
+    """
+    order = _bfs_order(graph)
+    count = len(order)
+    k = max(1, min(k, count))
+    parts = {node: i * k // count for i, node in enumerate(order)}
+    sizes = [0] * k
+    for part in parts.values():
+        sizes[part] += 1
+    capacity = max(max(sizes), int(count / k * (1 + imbalance)) + 1)
+
+    adj_list = graph.adj_list
+    reverse_adj_list = graph.reverse_adj_list
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        rng.shuffle(order)
+        moved = 0
+        for node in order:
+            counts = {}
+            for neighbor in adj_list[node]:
+                part = parts[neighbor]
+                counts[part] = counts.get(part, 0) + 1
+            for neighbor in reverse_adj_list[node]:
+                part = parts[neighbor]
+                counts[part] = counts.get(part, 0) + 1
+            current = parts[node]
+            best, best_count = current, counts.get(current, 0)
+            for part, weight in counts.items():
+                if weight > best_count and sizes[part] < capacity:
+                    best, best_count = part, weight
+            if best != current:
+                parts[node] = best
+                sizes[current] -= 1
+                sizes[best] += 1
+                moved += 1
+        if not moved:
+            break
+    return parts
+
+
+def cut_size(graph, parts):
+    """返回两端位于不同部分的边数"""
+    return sum(1 for start, edges in graph.adj_list.items()
+               for end in edges if parts[start] != parts[end])
+
+
+def _subgraph(graph, names):
+    """构建只包含 names 及其内部边的 CompactGraph"""
+    index = {name: i for i, name in enumerate(names)}
+    offsets = array('q', [0])
+    targets = array('i')
+    resistances = array('d')
+    for name in names:
+        for end, resistance in graph.adj_list[name].items():
+            position = index.get(end)
+            if position is not None:
+                targets.append(position)
+                resistances.append(resistance)
+        offsets.append(len(targets))
+    return CompactGraph(names, offsets, targets, resistances)
+
+
+def write_shards(graph, directory, k=None, parts=None):
+    """
+    把图划分后写成分片目录
+
+    参数:
+    graph -- Graph
+    directory -- 输出目录，不存在时创建
+    k -- 部分数；给出 parts 时可以省略
+    parts -- 已有的划分 {节点: 部分编号}，为 None 时调用 partition_graph(graph, k)
+
+    返回:
+    清单文件路径
+    """
+    if parts is None:
+        parts = partition_graph(graph, k)
+    k = max(parts.values(), default=-1) + 1
+    members = [[] for _ in range(k)]
+    for node, part in parts.items():
+        members[part].append(node)
+
+    boundary = [set() for _ in range(k)]
+    cut_edges = [[] for _ in range(k)]
+    for start, edges in graph.adj_list.items():
+        source = parts[start]
+        for end, resistance in edges.items():
+            target = parts[end]
+            if source != target:
+                boundary[source].add(start)
+                boundary[target].add(end)
+                cut_edges[source].append([start, end, resistance])
+
+    os.makedirs(directory, exist_ok=True)
+    shards = []
+    for part in range(k):
+        snapshot_name = f"part-{part}.snap"
+        table_name = f"part-{part}.json"
+        compact = _subgraph(graph, members[part])
+        save_snapshot(compact, os.path.join(directory, snapshot_name))
+        with open(os.path.join(directory, table_name), "w", encoding="utf-8") as f:
+            json.dump({"boundary": sorted(boundary[part]), "cut_edges": cut_edges[part]}, f, ensure_ascii=False)
+        shards.append({"snapshot": snapshot_name, "boundary": table_name,
+                       "nodes": compact.node_count(), "edges": compact.edge_count()})
+
+    path = os.path.join(directory, MANIFEST)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT_VERSION, "shards": shards}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+# 工作进程中打开的分片与其边界节点编号
+_shard = None
+_shard_boundary = None
+
+
+def _init_shard(snapshot_path, table_path):
+    global _shard, _shard_boundary
+    _shard = open_snapshot(snapshot_path)
+    with open(table_path, encoding="utf-8") as f:
+        names = json.load(f)["boundary"]
+    index = _shard.index
+    _shard_boundary = [index[name] for name in names]
+
+
+def _distances(offsets, targets, resistances, source):
+    """CSR 数组上的单源 Dijkstra，返回 {节点编号: 距离}"""
+    distances = {source: 0}
+    pq = [(0, source)]
+    while pq:
+        current_distance, current_node = heappop(pq)
+        if current_distance > distances[current_node]:
+            continue
+        begin, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, resistance in zip(targets[begin:stop], resistances[begin:stop]):
+            distance = current_distance + resistance
+            if distance < distances.get(neighbor, inf):
+                distances[neighbor] = distance
+                heappush(pq, (distance, neighbor))
+    return distances
+
+
+def _shard_contains(names):
+    index = _shard.index
+    return [name in index for name in names]
+
+
+def _shard_boundary_distances():
+    """返回 {边界节点: {同一分片内可到达的其他边界节点: 最短距离}}"""
+    names = _shard.names
+    table = {}
+    for source in _shard_boundary:
+        distances = _distances(_shard.offsets, _shard.targets, _shard.resistances, source)
+        table[names[source]] = {names[target]: distances[target]
+                                for target in _shard_boundary
+                                if target != source and target in distances}
+    return table
+
+
+def _shard_cyclic_components():
+    """返回分片内部含环的强连通分量（节点名称列表）"""
+    return [_shard._path_names(component) for component in cyclic_components(_shard.successors)]
+
+
+def _reach(offsets, targets, sources):
+    """从 sources 出发沿 CSR 数组可到达的节点编号集合"""
+    reached = set(sources)
+    stack = list(sources)
+    while stack:
+        node = stack.pop()
+        for neighbor in targets[offsets[node]:offsets[node + 1]]:
+            if neighbor not in reached:
+                reached.add(neighbor)
+                stack.append(neighbor)
+    return reached
+
+
+def _shard_members(labels):
+    """
+    labels 为 {边界节点: 跨分片分量编号}；返回 {分量编号: 本分片中属于该分量的节点名称列表}
+    """
+    index = _shard.index
+    groups = {}
+    for name, label in labels.items():
+        position = index.get(name)
+        if position is not None:
+            groups.setdefault(label, []).append(position)
+    reverse_offsets, sources, _ = _shard.reverse()
+    result = {}
+    for label, seeds in groups.items():
+        forward = _reach(_shard.offsets, _shard.targets, seeds)
+        backward = _reach(reverse_offsets, sources, seeds)
+        result[label] = _shard._path_names(sorted(forward & backward))
+    return result
+
+
+def _shard_distances_from(name, extra=()):
+    """从 name 出发到本分片各边界节点（以及 extra 中的节点）的距离"""
+    index = _shard.index
+    distances = _distances(_shard.offsets, _shard.targets, _shard.resistances, index[name])
+    names = _shard.names
+    targets = _shard_boundary + [index[other] for other in extra]
+    return {names[target]: distances[target] for target in targets if target in distances}
+
+
+def _shard_distances_to(name):
+    """本分片各边界节点到 name 的距离"""
+    target = _shard.index[name]
+    reverse_offsets, sources, reverse_resistances = _shard.reverse()
+    distances = _distances(reverse_offsets, sources, reverse_resistances, target)
+    names = _shard.names
+    return {names[source]: distances[source] for source in _shard_boundary if source in distances}
+
+
+def _shard_paths(pairs):
+    """返回分片内每对 (起点, 终点) 的最短路径节点列表"""
+    return [_shard.shortest_path(start, end).path for start, end in pairs]
+
+
+class ShardedGraph:
+    """
+    在分片目录上运行的跨分片分析
+
+    每个分片由一个独立的工作进程负责，工作进程只打开自己的分片文件。
+    用法:
+    with ShardedGraph(directory) as sharded:
+        sharded.shortest_path("A", "B")
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"不支持的分片格式：{manifest.get('format')}")
+        self.shards = manifest["shards"]
+        # 边界节点 -> 所在分片；割边 (起点, 终点, 电阻值)
+        self.boundary_part = {}
+        self.cut_edges = []
+        for part, shard in enumerate(self.shards):
+            with open(os.path.join(directory, shard["boundary"]), encoding="utf-8") as f:
+                table = json.load(f)
+            for name in table["boundary"]:
+                self.boundary_part[name] = part
+            self.cut_edges.extend(tuple(edge) for edge in table["cut_edges"])
+        self._executors = None
+        self._boundary_distances = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _workers(self):
+        if self._executors is None:
+            self._executors = [
+                ProcessPoolExecutor(max_workers=1, initializer=_init_shard,
+                                    initargs=(os.path.join(self.directory, shard["snapshot"]),
+                                              os.path.join(self.directory, shard["boundary"])))
+                for shard in self.shards
+            ]
+        return self._executors
+
+    def close(self):
+        """结束所有工作进程"""
+        if self._executors is not None:
+            for executor in self._executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+            self._executors = None
+
+    def _map(self, function, *args):
+        """在每个分片上执行 function，按分片顺序返回结果"""
+        futures = [executor.submit(function, *args) for executor in self._workers()]
+        return [future.result() for future in futures]
+
+    def locate(self, *names):
+        """返回每个节点所在的分片编号，节点不存在时为 None"""
+        located = [None] * len(names)
+        for part, found in enumerate(self._map(_shard_contains, names)):
+            for i, present in enumerate(found):
+                if present:
+                    located[i] = part
+        return located
+
+    def boundary_distances(self):
+        """边界节点之间的分片内最短距离 {边界节点: {边界节点: 距离}}，首次调用后缓存"""
+        if self._boundary_distances is None:
+            table = {}
+            for part_table in self._map(_shard_boundary_distances):
+                table.update(part_table)
+            self._boundary_distances = table
+        return self._boundary_distances
+
+    def cyclic_components(self):
+        """
+        返回所有含环的强连通分量（节点名称列表），与 Graph 上 cyclic_components 的结果相同
+        """
+        local = self._map(_shard_cyclic_components)
+
+        # 摘要图：分片内边界节点之间的可达关系 + 割边
+        summary = {name: list(reachable) for name, reachable in self.boundary_distances().items()}
+        for start, end, _ in self.cut_edges:
+            summary[start].append(end)
+        labels = {}
+        for label, component in enumerate(c for c in strongly_connected_components(summary) if len(c) > 1):
+            for name in component:
+                labels[name] = label
+
+        components = []
+        merged = set()
+        if labels:
+            groups = {}
+            for part_groups in self._map(_shard_members, labels):
+                for label, names in part_groups.items():
+                    groups.setdefault(label, []).extend(names)
+            for names in groups.values():
+                components.append(names)
+                merged.update(names)
+        # 没有并入跨分片分量的局部分量保持不变
+        for part_components in local:
+            for component in part_components:
+                if component[0] not in merged:
+                    components.append(component)
+        return components
+
+    def cycle_nodes(self):
+        """返回位于某个非法环路上的所有节点集合"""
+        return {node for component in self.cyclic_components() for node in component}
+
+    def has_cycles(self):
+        return bool(self.cyclic_components())
+
+    def shortest_path(self, start, end):
+        """
+        跨分片计算最短路径
+
+        返回:
+        ShortestPath(最小电阻值, 路径列表)，节点不存在或不可达时返回 None
+        """
+        start_part, end_part = self.locate(start, end)
+        if start_part is None or end_part is None:
+            return None
+        if start == end:
+            return ShortestPath(0, [start])
+
+        # 覆盖图：起点 → 起点分片的边界节点，边界节点之间的分片内距离与割边，边界节点 → 终点
+        # 起点、终点在同一分片时还需要分片内直接到达终点的距离
+        extra = [end] if start_part == end_part else []
+        first = self._workers()[start_part].submit(_shard_distances_from, start, extra)
+        last = self._workers()[end_part].submit(_shard_distances_to, end)
+        overlay = {}
+        for name, table in self.boundary_distances().items():
+            overlay[name] = dict(table)
+        for a, b, resistance in self.cut_edges:
+            overlay[a][b] = resistance
+        overlay.setdefault(start, {}).update(first.result())
+        for name, distance in last.result().items():
+            overlay.setdefault(name, {})[end] = distance
+
+        distances = {start: 0}
+        parents = {start: None}
+        pq = [(0, start)]
+        while pq:
+            current_distance, current_node = heappop(pq)
+            if current_node == end:
+                break
+            if current_distance > distances[current_node]:
+                continue
+            for neighbor, resistance in overlay.get(current_node, {}).items():
+                distance = current_distance + resistance
+                if distance < distances.get(neighbor, inf):
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heappush(pq, (distance, neighbor))
+        if end not in distances:
+            return None
+
+        hops = [end]
+        while parents[hops[-1]] is not None:
+            hops.append(parents[hops[-1]])
+        hops.reverse()
+
+        def part_of(name):
+            if name == start:
+                return start_part
+            if name == end:
+                return end_part
+            return self.boundary_part[name]
+
+        # 同一分片内的相邻两跳由该分片展开，跨分片的相邻两跳就是割边
+        segments = {}
+        for i, (a, b) in enumerate(zip(hops, hops[1:])):
+            part = part_of(a)
+            if part_of(b) == part:
+                segments.setdefault(part, []).append((i, a, b))
+        expanded = {}
+        futures = {part: self._workers()[part].submit(_shard_paths, [(a, b) for _, a, b in items])
+                   for part, items in segments.items()}
+        for part, items in segments.items():
+            for (i, _, _), path in zip(items, futures[part].result()):
+                expanded[i] = path
+
+        path = [start]
+        for i, (a, b) in enumerate(zip(hops, hops[1:])):
+            path.extend(expanded[i][1:] if i in expanded else [b])
+        return ShortestPath(distances[end], path)
@@ -0,0 +1,180 @@
+"""
+可复用的最短路径索引
+
+对同一个未修改的电路反复查询时，每个源节点的最短路径树只计算一次，
+之后的查询直接查表。缓存按最近最少使用（LRU）淘汰，总内存受预算限制；
+图被 add_edge / delete_edge / delete_node 等方法修改后（Graph.version 变化），
+缓存在下一次查询时自动清空。
+"""
+import sys
+from collections import OrderedDict
+from math import inf
+
+from results import ShortestPath
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# 默认缓存内存预算（字节）
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# all_pairs 默认允许的最大节点数
+MAX_ALL_PAIRS_NODES = 2000
+
+
+def _tree_size(distances, parents):
+    """估算一棵最短路径树占用的内存（字典本身加上距离浮点对象）"""
+    return sys.getsizeof(distances) + sys.getsizeof(parents) + 24 * len(distances)
+
+
+def _build_path(parents, end):
+    path = []
+    current = end
+    while current is not None:
+        path.append(current)
+        current = parents[current]
+    path.reverse()
+    return path
+
+
+class ShortestPathIndex:
+    def __init__(self, graph, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        参数:
+        graph -- 要查询的 Graph
+        memory_budget -- 缓存的最短路径树总内存上限（字节），至少保留最近的一棵
+        """
+        self.graph = graph
+        self.memory_budget = memory_budget
+        self._trees = OrderedDict()
+        self._memory = 0
+        self._version = graph.version
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """清空缓存"""
+        self._trees.clear()
+        self._memory = 0
+
+    def memory_usage(self):
+        """返回当前缓存的估算内存（字节）"""
+        return self._memory
+
+    def _check_version(self):
+        if self.graph.version != self._version:
+            self.clear()
+            self._version = self.graph.version
+
+    def tree(self, source):
+        """
+        返回 source 的单源最短路径树 (distances, parents)，命中缓存时不重新计算
+
+        返回的字典属于缓存，调用方不应修改。
+        """
+        self._check_version()
+        entry = self._trees.get(source)
+        if entry is not None:
+            self._trees.move_to_end(source)
+            self.hits += 1
+            return entry[0], entry[1]
+
+        self.misses += 1
+        distances, parents = self.graph.shortest_path_tree(source)
+        size = _tree_size(distances, parents)
+        self._trees[source] = (distances, parents, size)
+        self._memory += size
+
+        # 超出预算时淘汰最久未使用的树
+        while self._memory > self.memory_budget and len(self._trees) > 1:
+            _, (_, _, evicted) = self._trees.popitem(last=False)
+            self._memory -= evicted
+
+        return distances, parents
+
+    def distance(self, start, end):
+        """返回最小电阻值，节点不存在或不可达时返回 inf"""
+        if start not in self.graph.adj_list:
+            return inf
+        distances, _ = self.tree(start)
+        return distances.get(end, inf)
+
+    def query(self, start, end):
+        """
+        查询两点间电阻最小的路径
+
+        返回:
+        ShortestPath(最小电阻值, 路径列表)，节点不存在或不可达时返回 None
+        """
+        if start not in self.graph.adj_list:
+            return None
+        distances, parents = self.tree(start)
+        if end not in distances:
+            return None
+        return ShortestPath(distances[end], _build_path(parents, end))
+
+    def query_many(self, pairs):
+        """
+        批量查询多个 (起点, 终点)
+
+        同一起点的查询合并处理，每个起点最多计算一次最短路径树。
+
+        参数:
+        pairs -- 可迭代的 (起点, 终点) 序列
+
+        返回:
+        与输入顺序一致的结果列表，每项同 query 的返回值
+        """
+        pairs = list(pairs)
+        groups = {}
+        for i, (start, _) in enumerate(pairs):
+            groups.setdefault(start, []).append(i)
+
+        results = [None] * len(pairs)
+        for start, indices in groups.items():
+            if start not in self.graph.adj_list:
+                continue
+            distances, parents = self.tree(start)
+            for i in indices:
+                end = pairs[i][1]
+                if end in distances:
+                    results[i] = ShortestPath(distances[end], _build_path(parents, end))
+        return results
+
+    def all_pairs(self, max_nodes=MAX_ALL_PAIRS_NODES):
+        """
+        计算全源最短电阻矩阵，只适用于小电路
+
+        安装了 NumPy 时使用向量化的 Floyd–Warshall，返回 numpy 数组；
+        否则对每个节点运行一次 Dijkstra，返回嵌套列表。不可达为 inf。
+
+        参数:
+        max_nodes -- 节点数上限，超过时抛出 ValueError
+
+        返回:
+        (节点列表, 距离矩阵)，matrix[i][j] 为 nodes[i] 到 nodes[j] 的最小电阻
+        """
+        adj_list = self.graph.adj_list
+        nodes = list(adj_list)
+        if len(nodes) > max_nodes:
+            raise ValueError(f"节点数 {len(nodes)} 超过全源计算上限 {max_nodes}")
+
+        if numpy is not None:
+            index = {node: i for i, node in enumerate(nodes)}
+            matrix = numpy.full((len(nodes), len(nodes)), inf)
+            for node, edges in adj_list.items():
+                row = index[node]
+                for neighbor, resistance in edges.items():
+                    matrix[row, index[neighbor]] = resistance
+            numpy.fill_diagonal(matrix, 0)
+            for k in range(len(nodes)):
+                numpy.minimum(matrix, matrix[:, k:k + 1] + matrix[k:k + 1, :], out=matrix)
+            return nodes, matrix
+
+        matrix = []
+        for node in nodes:
+            # 不经过缓存，避免把常用的树挤出去
+            distances, _ = self.graph.shortest_path_tree(node)
+            matrix.append([distances.get(other, inf) for other in nodes])
+        return nodes, matrix
@@ -0,0 +1,86 @@
+"""
+可达性索引
+
+先把图按强连通分量缩合成有向无环图（同一分量内的节点互相可达），再为每个分量
+计算传递闭包的位集：第 i 位为 1 表示可以到达分量 i。
+
+Tarjan 算法按逆拓扑序产生分量，所以一个分量能到达的分量编号都不大于它自身，
+闭包可以按产生顺序一次算完；查询 reachable(a, b) 时编号比较即可排除一半的情况，
+其余情况只需检查一个字节中的一位。
+
+位集的总大小约为 分量数² / 16 字节，适合分量数在数万以内的电路。
+"""
+from cycles import strongly_connected_components
+
+# 默认允许的最大分量数（约 150MB 位集）
+MAX_COMPONENTS = 50000
+
+
+class ReachabilityIndex:
+    def __init__(self, graph, max_components=MAX_COMPONENTS):
+        """
+        参数:
+        graph -- Graph；索引记录构建时的 graph.version，图修改后需要重新构建
+        max_components -- 分量数上限，超过时抛出 ValueError
+        """
+        adj_list = graph.adj_list
+        self.version = graph.version
+        self.component = {}
+        self.members = []
+        closures = []
+
+        for cid, members in enumerate(strongly_connected_components(adj_list)):
+            if cid >= max_components:
+                raise ValueError(f"强连通分量数超过可达性索引上限 {max_components}")
+            component = self.component
+            for node in members:
+                component[node] = cid
+            successors = set()
+            for node in members:
+                for neighbor in adj_list[node]:
+                    successors.add(component[neighbor])
+            successors.discard(cid)
+            bits = 1 << cid
+            for other in successors:
+                bits |= closures[other]
+            closures.append(bits)
+            self.members.append(members)
+
+        # 转为字节串，查询时按字节取位，不必对大整数移位
+        self._closures = [bits.to_bytes((cid >> 3) + 1, "little") for cid, bits in enumerate(closures)]
+
+    def reachable(self, a, b):
+        """a 能否到达 b（a 总能到达自身）；节点不存在时返回 False"""
+        ca = self.component.get(a)
+        cb = self.component.get(b)
+        if ca is None or cb is None:
+            return False
+        if cb > ca:
+            return False
+        return bool(self._closures[ca][cb >> 3] & (1 << (cb & 7)))
+
+    def reachable_from(self, a):
+        """返回从 a 出发能到达的所有节点集合（含 a 本身）"""
+        ca = self.component.get(a)
+        if ca is None:
+            return set()
+        result = set()
+        for position, byte in enumerate(self._closures[ca]):
+            while byte:
+                low = byte & -byte
+                result.update(self.members[(position << 3) + low.bit_length() - 1])
+                byte ^= low
+        return result
+
+    def nodes_reaching(self, target):
+        """返回所有能到达 target 的节点集合（含 target 本身）"""
+        ct = self.component.get(target)
+        if ct is None:
+            return set()
+        position, mask = ct >> 3, 1 << (ct & 7)
+        result = set()
+        closures = self._closures
+        for cid in range(ct, len(closures)):
+            if closures[cid][position] & mask:
+                result.update(self.members[cid])
+        return result
@@ -0,0 +1,304 @@
+"""
+串联、并联化简
+
+网表中大量节点只是串联链中的一环（只有一条入边和一条出边），全路径搜索和环路
+检测在这些节点上逐个回溯，既加深了搜索深度，也放大了分支。ReducedGraph 反复执行
+两种化简，直到无法继续：
+
+串联：节点 b 只有一条入边 a → b 和一条出边 b → c，则删除 b，用一条边 a → c 代替；
+并联：化简产生的边 a → c 与已有的 a → c 重合时，合并为一条边，记录所有候选。
+
+每条化简后的边都记录它代表的原始结构（串联段与并联候选组成的树），分析在化简后的
+图上进行，输出前再展开回原始节点。化简后的边权取各候选中的最小总电阻，因此最短
+路径、电阻上限剪枝在化简图上依然正确；一条化简后的路径展开为其各段候选的所有组合，
+与原图中的路径一一对应。组合按需逐个产生，取第一条路径的代价只与它的长度有关。
+
+化简反映调用 reduce() 时的图，之后修改原图不会影响已有的 ReducedGraph。
+"""
+from collections import deque
+
+from cycles import normalize_cycle
+from results import ShortestPath, CircuitPath
+
+# 化简结构的节点类型：
+# [EDGE, 电阻值]
+# [SERIES, 最小总电阻, 各段结构, 段间被删除的节点]
+# [PARALLEL, 最小总电阻, 候选结构列表]
+EDGE = 0
+SERIES = 1
+PARALLEL = 2
+
+
+def _series(first, node, second):
+    """把 first → node → second 合并为一段串联结构；较短的一边并入较长的一边"""
+    if first[0] != SERIES:
+        first = [SERIES, first[1], deque([first]), deque()]
+    if second[0] != SERIES:
+        second = [SERIES, second[1], deque([second]), deque()]
+    if len(first[2]) >= len(second[2]):
+        first[3].append(node)
+        first[3].extend(second[3])
+        first[2].extend(second[2])
+        first[1] += second[1]
+        return first
+    second[3].appendleft(node)
+    second[3].extendleft(reversed(first[3]))
+    second[2].extendleft(reversed(first[2]))
+    second[1] += first[1]
+    return second
+
+
+def _parallel(existing, part):
+    """把 part 加入 existing 的并联候选"""
+    if existing[0] != PARALLEL:
+        existing = [PARALLEL, existing[1], [existing]]
+    if part[0] == PARALLEL:
+        existing[2].extend(part[2])
+    else:
+        existing[2].append(part)
+    existing[1] = min(existing[1], part[1])
+    return existing
+
+
+def _expand(part):
+    """逐个产生结构展开后的 (中间节点列表, 各边电阻列表)"""
+    kind = part[0]
+    if kind == EDGE:
+        yield [], [part[1]]
+    elif kind == PARALLEL:
+        for alternative in part[2]:
+            yield from _expand(alternative)
+    else:
+        yield from _combine(part[2], part[3])
+
+
+def _combine(segments, joints):
+    """
+    依次组合各段的展开，段与段之间插入 joints 中对应的节点
+
+    像里程表一样逐段推进：每段只保留当前的一个展开，后面的段用尽后才推进前一段，
+    并为后面的段重新创建生成器。因此产生第一个组合的代价只与它自身的长度成正比，
+    不会预先列出任何一段的全部展开。没有段时产生一个空组合。
+    """
+    segments = list(segments)
+    joints = list(joints)
+    if not segments:
+        yield [], []
+        return
+    last = len(segments) - 1
+    iterators = [_expand(segments[0])]
+    chosen = []
+    while iterators:
+        choice = next(iterators[-1], None)
+        if choice is None:
+            if len(chosen) == len(iterators):
+                chosen.pop()
+            iterators.pop()
+            continue
+        if len(chosen) == len(iterators):
+            chosen[-1] = choice
+        else:
+            chosen.append(choice)
+        if len(iterators) <= last:
+            iterators.append(_expand(segments[len(iterators)]))
+            continue
+        nodes = list(chosen[0][0])
+        resistances = list(chosen[0][1])
+        for joint, (segment_nodes, segment_resistances) in zip(joints, chosen[1:]):
+            nodes.append(joint)
+            nodes.extend(segment_nodes)
+            resistances.extend(segment_resistances)
+        yield nodes, resistances
+
+
+def _cheapest(part):
+    """返回总电阻最小的展开 (中间节点列表, 各边电阻列表)"""
+    kind = part[0]
+    if kind == EDGE:
+        return [], [part[1]]
+    if kind == PARALLEL:
+        return _cheapest(min(part[2], key=lambda alternative: alternative[1]))
+    nodes, resistances = _cheapest(part[2][0])
+    for joint, segment in zip(part[3], list(part[2])[1:]):
+        segment_nodes, segment_resistances = _cheapest(segment)
+        nodes.append(joint)
+        nodes.extend(segment_nodes)
+        resistances.extend(segment_resistances)
+    return nodes, resistances
+
+
+def _interior(part):
+    """产生结构中所有被删除的节点"""
+    stack = [part]
+    while stack:
+        part = stack.pop()
+        if part[0] == SERIES:
+            yield from part[3]
+            stack.extend(part[2])
+        elif part[0] == PARALLEL:
+            stack.extend(part[2])
+
+
+class ReducedGraph:
+    def __init__(self, graph, keep=()):
+        """
+        参数:
+        graph -- 要化简的 Graph，不会被修改
+        keep -- 必须保留的节点（例如之后要查询的起点、终点），即使它们位于串联链中
+        """
+        from back import Graph
+
+        keep = set(keep)
+        adj_list = {node: dict(edges) for node, edges in graph.adj_list.items()}
+        reverse_adj_list = {node: dict(edges) for node, edges in graph.reverse_adj_list.items()}
+        # 化简产生的边 (起点, 终点) -> 结构；未出现的边就是原始的边
+        self.parts = parts = {}
+
+        work = list(adj_list)
+        while work:
+            node = work.pop()
+            if node in keep or node not in adj_list:
+                continue
+            incoming = reverse_adj_list[node]
+            outgoing = adj_list[node]
+            if len(incoming) != 1 or len(outgoing) != 1:
+                continue
+            (a, r1), = incoming.items()
+            (c, r2), = outgoing.items()
+            if a == node or c == node:
+                continue
+
+            part = _series(parts.pop((a, node), None) or [EDGE, r1],
+                           node,
+                           parts.pop((node, c), None) or [EDGE, r2])
+            del adj_list[a][node]
+            del reverse_adj_list[c][node]
+            del adj_list[node]
+            del reverse_adj_list[node]
+            existing = adj_list[a].get(c)
+            if existing is not None:
+                part = _parallel(parts.pop((a, c), None) or [EDGE, existing], part)
+            adj_list[a][c] = part[1]
+            reverse_adj_list[c][a] = part[1]
+            parts[(a, c)] = part
+            # 两端可能因此变成新的串联节点
+            work.append(a)
+            work.append(c)
+
+        self.graph = Graph()
+        self.graph.adj_list = adj_list
+        self.graph.reverse_adj_list = reverse_adj_list
+        self.original_node_count = len(graph.adj_list)
+        # 被删除的节点 -> 包含它的化简后的边
+        self.eliminated = {}
+        for edge, part in parts.items():
+            for node in _interior(part):
+                self.eliminated[node] = edge
+
+    def node_count(self):
+        return len(self.graph.adj_list)
+
+    def _check(self, *nodes):
+        for node in nodes:
+            if node in self.eliminated:
+                raise ValueError(f"节点 {node} 已在化简中被合并，请通过 keep 参数保留")
+
+    def _part(self, start, end):
+        part = self.parts.get((start, end))
+        if part is None:
+            return [EDGE, self.graph.adj_list[start][end]]
+        return part
+
+    def expand_path(self, path):
+        """
+        把化简图中的一条路径展开为原图中的路径
+
+        参数:
+        path -- 化简图中的节点列表
+
+        返回:
+        迭代器，每次产生 CircuitPath(原图路径, 总电阻值)
+        """
+        parts = [self._part(a, b) for a, b in zip(path, path[1:])]
+        for inner, resistances in _combine(parts, path[1:-1]):
+            nodes = [path[0]]
+            nodes.extend(inner)
+            if len(path) > 1:
+                nodes.append(path[-1])
+            yield CircuitPath(nodes, sum(resistances))
+
+    def iter_paths(self, start_node, end_node, max_paths=None, max_resistance=None, max_depth=None,
+                   progress=None):
+        """
+        在化简图上枚举路径，逐条产生展开后的原图路径，参数含义同 Graph.iter_paths
+
+        电阻和深度上限先在化简图上剪枝（化简后的边权与边数都不大于原图），
+        展开后再按实际值过滤。
+
+        返回:
+        迭代器，每次产生 CircuitPath(路径, 总电阻值)
+        """
+        self._check(start_node, end_node)
+        if max_paths is not None and max_paths <= 0:
+            return
+        count = 0
+        for reduced in self.graph.iter_paths(start_node, end_node, max_resistance=max_resistance,
+                                             max_depth=max_depth, progress=progress):
+            for path in self.expand_path(reduced.path):
+                if max_resistance is not None and path.resistance > max_resistance:
+                    continue
+                if max_depth is not None and len(path.path) - 1 > max_depth:
+                    continue
+                yield path
+                count += 1
+                if max_paths is not None and count >= max_paths:
+                    return
+
+    def all_paths_simulation(self, start_node, end_node, max_paths=None, max_resistance=None, max_depth=None):
+        """返回展开后的 CircuitPath 列表，参数含义同 iter_paths"""
+        return list(self.iter_paths(start_node, end_node, max_paths, max_resistance, max_depth))
+
+    def shortest_path(self, start, end, progress=None):
+        """
+        在化简图上计算最短路径并展开
+
+        返回:
+        ShortestPath(最小电阻值, 原图路径)；不可达或节点不存在时返回 None
+        """
+        self._check(start, end)
+        reduced = self.graph.shortest_path(start, end, progress=progress)
+        if reduced is None:
+            return None
+        path = reduced.path
+        nodes = [path[0]]
+        resistances = []
+        for a, b in zip(path, path[1:]):
+            segment_nodes, segment_resistances = _cheapest(self._part(a, b))
+            nodes.extend(segment_nodes)
+            nodes.append(b)
+            resistances.extend(segment_resistances)
+        return ShortestPath(sum(resistances), nodes)
+
+    def iter_cycles(self, max_cycles=None, max_length=None, progress=None):
+        """
+        在化简图上枚举环路，逐个产生展开后的原图环路，参数含义同 Graph.iter_cycles
+
+        返回:
+        迭代器，每个环路为标准化后的原图节点元组
+        """
+        if max_cycles is not None and max_cycles <= 0:
+            return
+        count = 0
+        for cycle in self.graph.iter_cycles(max_length=max_length, progress=progress):
+            for path in self.expand_path(list(cycle)):
+                nodes = path.path[:-1]
+                if max_length is not None and len(nodes) > max_length:
+                    continue
+                yield normalize_cycle(nodes)
+                count += 1
+                if max_cycles is not None and count >= max_cycles:
+                    return
+
+    def detect_cycles(self, max_cycles=None, max_length=None):
+        """返回展开后的全部环路集合"""
+        return set(self.iter_cycles(max_cycles, max_length))
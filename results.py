@@ -0,0 +1,70 @@
+"""
+分析结果类型与报告回调
+
+Graph 的方法默认不输出任何内容，只返回结果。结果都是 namedtuple，
+仍然可以像原来的元组一样解包，例如 resistance, path = graph.shortest_path(a, b)。
+
+需要输出时，给 Graph 传入 reporter 回调：每次编辑或分析完成后调用
+reporter(事件名, 数据)。命令行使用 console_reporter 输出与原来相同的文字；
+不关心输出的调用方（批量查询、GUI）不传回调，也就不需要为格式化付出代价。
+
+事件名与数据:
+edge_added -- (起点, 终点, 电阻值)
+edge_deleted / edge_missing -- (起点, 终点)
+node_deleted / node_missing -- 节点
+nodes_deleted -- 删除的节点数
+nodes_missing -- (起点, 终点)，查询的节点不存在
+cycles -- 环路集合
+paths -- (起点, 终点, CircuitPath 列表)
+shortest_path -- (起点, 终点, ShortestPath 或 None)
+load_errors -- 网表格式错误的汇总文字
+"""
+from collections import namedtuple
+
+# 最短路径：(最小电阻值, 路径列表)
+ShortestPath = namedtuple("ShortestPath", ["resistance", "path"])
+# 全路径搜索的一条路径：(路径列表, 总电阻值)
+CircuitPath = namedtuple("CircuitPath", ["path", "resistance"])
+
+
+def console_reporter(event, data):
+    """把事件格式化输出到标准输出（命令行使用）"""
+    if event == "edge_added":
+        start, end, resistance = data
+        print(f"添加边：{start} → {end}，电阻值：{resistance}Ω")
+    elif event == "edge_deleted":
+        print(f"删除边：{data[0]} → {data[1]}")
+    elif event == "edge_missing":
+        print(f"边 {data[0]} → {data[1]} 不存在")
+    elif event == "node_deleted":
+        print(f"删除节点：{data}")
+    elif event == "node_missing":
+        print(f"节点 {data} 不存在")
+    elif event == "nodes_deleted":
+        print(f"删除节点：共 {data} 个")
+    elif event == "nodes_missing":
+        print(f"错误：节点 {data[0]} 或 {data[1]} 不存在")
+    elif event == "cycles":
+        if data:
+            print("检测到以下非法环路：")
+            for cycle in data:
+                print(" → ".join(cycle))
+        else:
+            print("未检测到非法环路")
+    elif event == "paths":
+        start, end, paths = data
+        if paths:
+            print(f"从 {start} 到 {end} 的所有可能路径:")
+            for path, resistance in paths:
+                print(f"{' → '.join(path)} ({resistance}Ω)")
+        else:
+            print(f"没有找到从 {start} 到 {end} 的路径")
+    elif event == "shortest_path":
+        start, end, result = data
+        if result is None:
+            print(f"不存在从 {start} 到 {end} 的路径")
+        else:
+            print(f"\n最短路径：{' → '.join(result.path)}")
+            print(f"总电阻：{result.resistance}Ω")
+    elif event == "load_errors":
+        print(data)
@@ -0,0 +1,275 @@
+"""
+虚拟化的结果列表控件
+
+结果只保存在 Python 列表中，Treeview 里始终只有可见的那几行：
+滚动时只更新这些行的内容，因此无论结果有多少条，控件本身的开销都是固定的。
+结果的内容可以是原始数据（例如路径的节点列表），由 formatter 在行进入可见
+区域时才转换为文字，添加大量结果时不必预先格式化每一行。
+支持按电阻或长度排序，以及按关键字筛选。
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# 列标识与标题
+COLUMNS = ("index", "resistance", "length", "text")
+HEADINGS = {"index": "序号", "resistance": "电阻 (Ω)", "length": "长度", "text": "内容"}
+# 无法从主题中取得行高时使用的默认值（像素）
+DEFAULT_ROW_HEIGHT = 20
+# 搜索框停止输入后多久开始筛选（毫秒）
+SEARCH_DELAY = 200
+
+
+def _sort_value(value):
+    """排序键：没有数值的行排在最后"""
+    return (value is None, value if value is not None else 0)
+
+
+class ResultView(ttk.Frame):
+    """
+    显示大量结果的列表
+
+    每条结果为 (内容, 电阻值, 长度)，电阻值和长度可以为 None；内容为文字，
+    或者交给 clear() 时指定的 formatter 转换为文字的原始数据。
+    标题和提示信息显示在列表上方的标签中，不占用结果行。
+    """
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = []
+        # 把结果内容转换为文字的函数，None 表示内容本身就是文字
+        self.formatter = None
+        # 当前筛选、排序后的行号列表
+        self.view = []
+        self.first = 0
+        self.sort_column = None
+        self.sort_reverse = False
+        self.keyword = ""
+        self._search_job = None
+        self._sorted = True
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        # 标题与搜索框
+        top = ttk.Frame(self)
+        top.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        top.grid_columnconfigure(0, weight=1)
+        self.title_var = tk.StringVar()
+        ttk.Label(top, textvariable=self.title_var).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(top, text="搜索:").grid(row=0, column=1, padx=2)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self._schedule_search)
+        ttk.Entry(top, textvariable=self.search_var, width=20).grid(row=0, column=2, padx=2)
+
+        self.message_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.message_var).grid(row=1, column=0, columnspan=2, sticky=tk.W)
+
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings", selectmode="browse")
+        for column in COLUMNS:
+            self.tree.heading(column, text=HEADINGS[column],
+                              command=lambda c=column: self.sort_by(c))
+        self.tree.column("index", width=60, stretch=False, anchor=tk.E)
+        self.tree.column("resistance", width=90, stretch=False, anchor=tk.E)
+        self.tree.column("length", width=50, stretch=False, anchor=tk.E)
+        self.tree.column("text", width=400, stretch=True)
+        self.tree.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        # 滚动条对应整个结果列表，而不是 Treeview 中的行
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=2, column=1, sticky=(tk.N, tk.S))
+
+        style = ttk.Style(self)
+        try:
+            self.row_height = int(style.lookup("Treeview", "rowheight")) or DEFAULT_ROW_HEIGHT
+        except (ValueError, tk.TclError):
+            self.row_height = DEFAULT_ROW_HEIGHT
+        self.visible = 1
+        self._items = []
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible) or "break")
+        self.tree.bind("<Control-c>", self._copy_selection)
+
+    def clear(self, title="", formatter=None):
+        """
+        清空结果并设置标题
+
+        参数:
+        title -- 列表上方的标题
+        formatter -- formatter(内容) 返回显示的文字，之后 extend 的结果都按它显示；
+                     None 表示内容本身就是文字
+        """
+        self.rows = []
+        self.formatter = formatter
+        self.view = []
+        self.first = 0
+        self._sorted = True
+        self.title_var.set(title)
+        self.message_var.set("")
+        self.refresh()
+
+    def set_title(self, title):
+        self.title_var.set(title)
+
+    def set_message(self, message):
+        """设置列表上方的提示信息（例如"未找到"或截断说明）"""
+        self.message_var.set(message)
+
+    def extend(self, rows):
+        """
+        追加结果，只刷新可见行
+
+        参数:
+        rows -- 可迭代的 (内容, 电阻值, 长度)
+        """
+        start = len(self.rows)
+        self.rows.extend(rows)
+        new = range(start, len(self.rows))
+        if self.keyword:
+            keyword = self.keyword
+            text = self.text
+            self.view.extend(i for i in new if keyword in text(i))
+        else:
+            self.view.extend(new)
+        if self.sort_column is not None:
+            # 已排序部分加上新追加的一段，下一次刷新时 timsort 只需合并两段
+            self._sorted = False
+        self.refresh()
+
+    def sort_by(self, column):
+        """按列排序，再次点击同一列时反转顺序"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._sorted = False
+        for name in COLUMNS:
+            arrow = ""
+            if name == column:
+                arrow = " ▼" if self.sort_reverse else " ▲"
+            self.tree.heading(name, text=HEADINGS[name] + arrow)
+        self.first = 0
+        self.refresh()
+
+    def text(self, row_id):
+        """返回第 row_id 条结果显示的文字"""
+        content = self.rows[row_id][0]
+        if self.formatter is None:
+            return content
+        return self.formatter(content)
+
+    def _sort_view(self):
+        rows = self.rows
+        column = self.sort_column
+        if column == "index":
+            key = None
+        elif column == "resistance":
+            key = lambda i: _sort_value(rows[i][1])
+        elif column == "length":
+            key = lambda i: _sort_value(rows[i][2])
+        else:
+            key = self.text
+        self.view.sort(key=key, reverse=self.sort_reverse)
+        self._sorted = True
+
+    def _schedule_search(self, *args):
+        """搜索框内容变化后延迟筛选，避免每输入一个字符都扫描全部结果"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY, self._apply_search)
+
+    def _apply_search(self):
+        self._search_job = None
+        self.keyword = self.search_var.get().strip()
+        keyword = self.keyword
+        if keyword:
+            text = self.text
+            self.view = [i for i in range(len(self.rows)) if keyword in text(i)]
+        else:
+            self.view = list(range(len(self.rows)))
+        self._sorted = self.sort_column is None
+        self.first = 0
+        self.refresh()
+
+    def scroll(self, delta):
+        """向下滚动 delta 行（负数向上）"""
+        self.first += delta
+        self.refresh()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.view))
+        elif unit == "pages":
+            self.first += int(amount) * self.visible
+        else:
+            self.first += int(amount)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_resize(self, event):
+        # 减去表头占用的一行
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    def _move_selection(self, delta):
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        position = self._items.index(selection[0]) + delta
+        if position < 0:
+            self.scroll(-1)
+            position = 0
+        elif position >= len(self._items):
+            self.scroll(1)
+            position = len(self._items) - 1
+        if self._items:
+            self.tree.selection_set(self._items[position])
+        return "break"
+
+    def _copy_selection(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.clipboard_clear()
+            self.clipboard_append(self.tree.set(selection[0], "text"))
+
+    def refresh(self):
+        """按当前位置重新填充可见行"""
+        if not self._sorted:
+            self._sort_view()
+
+        total = len(self.view)
+        self.first = max(0, min(self.first, total - self.visible))
+        shown = self.view[self.first:self.first + self.visible]
+
+        # 只增删差额，已有的行直接改写内容
+        while len(self._items) < len(shown):
+            self._items.append(self.tree.insert("", tk.END))
+        while len(self._items) > len(shown):
+            self.tree.delete(self._items.pop())
+
+        # 只有这几行在这里格式化，其余结果保持原始数据
+        for item, row_id in zip(self._items, shown):
+            _, resistance, length = self.rows[row_id]
+            self.tree.item(item, values=(
+                row_id + 1,
+                "" if resistance is None else f"{resistance:g}",
+                "" if length is None else length,
+                self.text(row_id),
+            ))
+
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + len(shown)) / total)
+        else:
+            self.scrollbar.set(0, 1)
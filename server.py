@@ -0,0 +1,433 @@
+"""
+查询服务
+
+在一个进程中常驻一张 Graph，通过本地 TCP 端口或 Unix 套接字提供查询和编辑，
+协议为逐行 JSON：每行一个请求，每个响应也是一行。
+
+请求:  {"id": 1, "op": "shortest_path", "args": ["A", "B"], "kwargs": {"bidirectional": true}}
+响应:  {"id": 1, "result": {"resistance": 12.0, "path": ["A", "C", "B"]}}
+出错:  {"id": 1, "error": "ValueError: ..."}
+
+每个操作的参数按 SIGNATURES 检查：节点名必须是字符串，电阻值必须是有限的非负数
+（数值或数值字符串），不接受多余的参数；编辑的参数在写入图之前全部检查完。
+结果中的无穷大（例如不连通时的等效电阻）写成字符串 "inf"，输出总是标准 JSON。
+
+同一连接上可以连续发送多个请求而不必等待响应，响应按完成顺序返回，用 id 对应。
+请求按到达顺序生效：查询看到的是它到达时的图，之后的编辑不会影响它。
+
+并发处理:
+- 编辑直接在事件循环中执行（单次编辑很快），撤销历史只保留最近 max_history 个编辑；
+- 耗时的查询在到达时取得图的写时复制分支（见 Graph.fork）并在执行器中运行，
+  事件循环因此始终可以响应其他请求，之后的编辑也不会与正在运行的查询冲突；
+  廉价的查询直接在事件循环中读取常驻的图；
+- 图未修改期间，参数完全相同且仍在进行中的查询合并为一次计算，结果发给所有请求方。
+
+默认执行器是事件循环的线程池，查询与事件循环共享 GIL，但事件循环不会被阻塞；
+也可以传入自己的执行器。
+
+用法:
+python server.py circuit.txt --port 8765
+python server.py circuit.txt --unix /tmp/circuit.sock
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+
+from back import Graph
+from results import console_reporter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 单行请求的最大字节数（批量添加边时请求可能很长）
+MAX_LINE = 16 * 1024 * 1024
+# 客户端未指定上限时，路径与环路枚举最多返回的数量
+DEFAULT_MAX_PATHS = 10000
+DEFAULT_MAX_CYCLES = 10000
+# 常驻的图最多保留的可撤销事务数，更早的修改日志被释放
+DEFAULT_MAX_HISTORY = 100
+
+# 查询：操作名 -> 是否在执行器中运行（不在执行器中运行的查询直接读取常驻的图）
+QUERIES = {
+    "shortest_path": True,
+    "k_shortest_paths": True,
+    "all_paths_simulation": True,
+    "detect_cycles": True,
+    "has_cycles": True,
+    "cycle_nodes": True,
+    "strongly_connected_components": True,
+    "equivalent_resistance": True,
+    "reachable": True,
+    "predecessors": False,
+    "in_degree": False,
+    "out_degree": False,
+}
+# 编辑：在事件循环中直接作用于常驻的图
+EDITS = {
+    "add_edge",
+    "add_edges",
+    "add_node",
+    "delete_edge",
+    "delete_node",
+    "delete_nodes",
+    "undo",
+    "redo",
+    "clear_history",
+}
+# 未指定或为 null 时补上的数量上限
+LIMITS = {
+    "all_paths_simulation": ("max_paths", DEFAULT_MAX_PATHS),
+    "detect_cycles": ("max_cycles", DEFAULT_MAX_CYCLES),
+}
+
+
+def _to_json(value):
+    """
+    把分析结果转换为可以写成 JSON 的值；namedtuple 转为对象，集合转为排序后的列表
+
+    JSON 没有无穷大，不连通时的等效电阻等无穷值写成字符串 "inf"。
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        return {key: _to_json(item) for key, item in value._asdict().items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_to_json(item) for item in value)
+    return value
+
+
+def _call(method, args, kwargs):
+    return _to_json(method(*args, **kwargs))
+
+
+def _resistance(value):
+    """把请求中的电阻值转换为有限的非负浮点数"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"电阻值必须是数值：{value!r}")
+    try:
+        resistance = float(value)
+    except ValueError:
+        raise ValueError(f"电阻值必须是数值：{value!r}") from None
+    if not math.isfinite(resistance) or resistance < 0:
+        raise ValueError(f"电阻值必须是有限的非负数：{value!r}")
+    return resistance
+
+
+def _node(value):
+    """节点名与网表中一样必须是字符串，否则数值 1 与网表中的 "1" 会成为两个节点"""
+    if not isinstance(value, str):
+        raise ValueError(f"节点名必须是字符串：{value!r}")
+    return value
+
+
+def _node_list(value):
+    if not isinstance(value, list):
+        raise ValueError(f"节点列表必须是数组：{value!r}")
+    return [_node(node) for node in value]
+
+
+def _node_set(value):
+    return set(_node_list(value))
+
+
+def _edge(item):
+    """检查一条边 [起点, 终点, 电阻值]"""
+    if not isinstance(item, list) or len(item) != 3:
+        raise ValueError(f"边必须是 [起点, 终点, 电阻值]：{item!r}")
+    start, end, resistance = item
+    return _node(start), _node(end), _resistance(resistance)
+
+
+def _edge_list(value):
+    if not isinstance(value, list):
+        raise ValueError(f"边列表必须是数组：{value!r}")
+    return [_edge(item) for item in value]
+
+
+def _edge_set(value):
+    """被排除的边 [[起点, 终点], ...]，转为 (起点, 终点) 集合"""
+    if not isinstance(value, list):
+        raise ValueError(f"边列表必须是数组：{value!r}")
+    edges = set()
+    for item in value:
+        if not isinstance(item, list) or len(item) != 2:
+            raise ValueError(f"边必须是 [起点, 终点]：{item!r}")
+        edges.add((_node(item[0]), _node(item[1])))
+    return edges
+
+
+def _count(value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"数量必须是非负整数：{value!r}")
+    return value
+
+
+def _optional_count(value):
+    return None if value is None else _count(value)
+
+
+def _optional_resistance(value):
+    return None if value is None else _resistance(value)
+
+
+def _flag(value):
+    if not isinstance(value, bool):
+        raise ValueError(f"开关参数必须是 true 或 false：{value!r}")
+    return value
+
+
+_SEARCH_OPTIONS = {
+    "avoid_nodes": _node_set,
+    "avoid_edges": _edge_set,
+    "via_nodes": _node_list,
+}
+# 操作名 -> (各位置参数的检查函数, 允许的关键字参数 -> 检查函数)；检查函数返回转换后的值
+SIGNATURES = {
+    "add_edge": ((_node, _node, _resistance), {}),
+    "add_edges": ((_edge_list,), {}),
+    "add_node": ((_node,), {}),
+    "delete_edge": ((_node, _node), {}),
+    "delete_node": ((_node,), {}),
+    "delete_nodes": ((_node_list,), {}),
+    "undo": ((), {}),
+    "redo": ((), {}),
+    "clear_history": ((), {}),
+    "shortest_path": ((_node, _node), dict(_SEARCH_OPTIONS, bidirectional=_flag,
+                                           max_resistance=_optional_resistance)),
+    "k_shortest_paths": ((_node, _node, _count), {}),
+    "all_paths_simulation": ((_node, _node), dict(_SEARCH_OPTIONS, max_paths=_count,
+                                                  max_resistance=_optional_resistance,
+                                                  max_depth=_optional_count)),
+    "detect_cycles": ((), {"max_cycles": _count, "max_length": _optional_count}),
+    "has_cycles": ((), {}),
+    "cycle_nodes": ((), {}),
+    "strongly_connected_components": ((), {}),
+    "equivalent_resistance": ((_node, _node), {}),
+    "reachable": ((_node, _node), {}),
+    "predecessors": ((_node,), {}),
+    "in_degree": ((_node,), {}),
+    "out_degree": ((_node,), {}),
+}
+
+
+def _check_args(op, args, kwargs):
+    """
+    按 SIGNATURES 检查并转换请求参数
+
+    位置参数个数必须完全一致，不接受未列出的关键字参数；编辑的参数在写入图之前
+    全部检查完，出错时图不变。
+
+    返回:
+    (args 列表, kwargs 字典)
+    """
+    positional, options = SIGNATURES[op]
+    if len(args) != len(positional):
+        raise ValueError(f"{op} 需要 {len(positional)} 个位置参数，收到 {len(args)} 个")
+    unknown = set(kwargs) - set(options)
+    if unknown:
+        raise ValueError(f"{op} 不支持参数：{', '.join(sorted(map(str, unknown)))}")
+    args = [check(value) for check, value in zip(positional, args)]
+    kwargs = {name: options[name](value) for name, value in kwargs.items()}
+    return args, kwargs
+
+
+class GraphServer:
+    def __init__(self, graph, executor=None, max_history=DEFAULT_MAX_HISTORY):
+        """
+        参数:
+        graph -- 常驻的 Graph
+        executor -- 运行耗时查询的执行器，None 表示事件循环的默认线程池
+        max_history -- 最多可撤销的编辑数（见 Graph.set_history_limit），None 表示不限；
+                       服务长期运行，不设上限时修改日志会随编辑无限增长
+        """
+        graph.set_history_limit(max_history)
+        self.graph = graph
+        self.executor = executor
+        # 进行中的查询 (操作名, 参数, 图版本) -> Task
+        self.in_flight = {}
+        self.coalesced = 0
+        self.requests = 0
+        self._view = None
+        self._view_version = None
+        self._server = None
+        # 连接的 writer -> 处理该连接的任务
+        self._clients = {}
+
+    def _current_view(self):
+        """
+        返回当前版本的只读分支；图未修改时所有查询共用同一个分支
+
+        只在需要进入执行器的查询到达时调用，连续编辑之间没有这类查询时不会创建分支。
+        """
+        if self._view is None or self._view_version != self.graph.version:
+            self._view = self.graph.fork()
+            self._view_version = self.graph.version
+        return self._view
+
+    def info(self):
+        graph = self.graph
+        return {
+            "nodes": len(graph.adj_list),
+            "edges": sum(len(edges) for edges in graph.adj_list.values()),
+            "version": graph.version,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.in_flight),
+        }
+
+    async def execute(self, op, args=(), kwargs=None):
+        """
+        执行一个操作并返回可以写成 JSON 的结果
+
+        在第一次 await 之前就确定查询使用的图版本，因此请求按到达顺序生效。
+        """
+        self.requests += 1
+        if not isinstance(args, (list, tuple)):
+            raise ValueError("args 必须是数组")
+        if kwargs is not None and not isinstance(kwargs, dict):
+            raise ValueError("kwargs 必须是对象")
+        kwargs = dict(kwargs or {})
+        if op == "info":
+            return self.info()
+        if op not in EDITS and op not in QUERIES:
+            raise ValueError(f"不支持的操作：{op}")
+        limit = LIMITS.get(op)
+        if limit is not None:
+            # 显式传 null 也不能取消上限
+            name, default = limit
+            if kwargs.get(name) is None:
+                kwargs[name] = default
+        # 合并查询按客户端发来的原始参数区分
+        key = (op, json.dumps([args, kwargs], sort_keys=True), self.graph.version)
+        args, kwargs = _check_args(op, args, kwargs)
+        if op in EDITS:
+            return _to_json(getattr(self.graph, op)(*args, **kwargs))
+        if not QUERIES[op]:
+            # 廉价查询在事件循环中立即完成，直接读取常驻的图，不需要分支
+            return _call(getattr(self.graph, op), args, kwargs)
+
+        method = getattr(self._current_view(), op)
+        task = self.in_flight.get(key)
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(self.executor, _call, method, args, kwargs)
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # 某个请求方断开时不取消其他请求方共享的计算
+        return await asyncio.shield(task)
+
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("请求必须是 JSON 对象")
+            request_id = request.get("id")
+            result = await self.execute(request.get("op"), request.get("args", []), request.get("kwargs"))
+            response = {"id": request_id, "result": result}
+        except Exception as e:
+            response = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+        if not writer.is_closing():
+            try:
+                data = json.dumps(response, ensure_ascii=False, allow_nan=False)
+            except ValueError as e:
+                # 结果中仍有无法写成标准 JSON 的值（例如参数里传回的 NaN）
+                data = json.dumps({"id": request_id, "error": f"ValueError: {e}"}, ensure_ascii=False)
+            writer.write(data.encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        pending = set()
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 超过 MAX_LINE 的请求无法继续分行，直接断开
+                    response = {"id": None, "error": f"ValueError: 请求超过 {MAX_LINE} 字节"}
+                    writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # 每个请求一个任务，慢查询不会挡住同一连接上后面的请求
+                task = asyncio.ensure_future(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        """
+        开始监听
+
+        参数:
+        host, port -- TCP 地址；port 为 0 时由系统分配
+        path -- Unix 套接字路径，给出时忽略 host 和 port
+
+        返回:
+        asyncio.Server
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_client, path, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port, limit=MAX_LINE)
+        return self._server
+
+    async def close(self):
+        """停止监听并断开所有连接"""
+        handlers = list(self._clients.values())
+        for writer in list(self._clients):
+            writer.close()
+        if handlers:
+            await asyncio.gather(*handlers, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def _serve(graph, host, port, path):
+    server = GraphServer(graph)
+    listener = await server.start(host, port, path)
+    address = path or "{}:{}".format(*listener.sockets[0].getsockname()[:2])
+    print(f"正在监听 {address}，节点数 {len(graph.adj_list)}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电路查询服务")
+    parser.add_argument("netlist", nargs="?", help="启动时加载的网表文件，省略时从空图开始")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Unix 套接字路径，给出时不监听 TCP 端口")
+    args = parser.parse_args(argv)
+
+    if args.netlist:
+        # 只在加载时输出格式错误汇总，之后的编辑不输出
+        graph = Graph.load(args.netlist, reporter=console_reporter)
+        graph.reporter = None
+    else:
+        graph = Graph()
+    try:
+        asyncio.run(_serve(graph, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
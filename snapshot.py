@@ -0,0 +1,158 @@
+"""
+紧凑图的二进制快照
+
+文件布局（全部为小端序，各段按 8 字节对齐）：
+
+    头部（64 字节）  魔数 b"CIRCSNAP"、格式版本、保留标志、
+                     节点数 V、边数 E、名称数据字节数
+    名称偏移         uint64 × (V+1)，第 i 个名称位于名称数据的 [off[i], off[i+1])
+    名称数据         各节点名称的 UTF-8 编码依次拼接
+    边区间 offsets   int64 × (V+1)
+    终点 targets     int32 × E
+    电阻 resistances float64 × E
+
+以 mmap 方式打开时各数组直接映射文件内容，不做任何复制，
+多个分析进程打开同一个快照时通过页缓存共享同一份物理内存。
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from compact import CompactGraph
+
+MAGIC = b"CIRCSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_SIZE = 64
+
+
+class SnapshotError(ValueError):
+    """快照文件损坏或版本不兼容"""
+
+
+def _padding(size):
+    return -size % 8
+
+
+def _write_array(f, values):
+    """以小端序写出数组并补齐到 8 字节"""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    data = memoryview(values).cast("B")
+    f.write(data)
+    f.write(b"\0" * _padding(len(data)))
+
+
+def save_snapshot(compact, path):
+    """
+    把 CompactGraph 写入快照文件
+
+    参数:
+    compact -- 紧凑图
+    path -- 快照文件路径
+    """
+    encoded = [name.encode("utf-8") for name in compact.names]
+    name_offsets = array("Q", [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        name_offsets.append(total)
+
+    node_count = compact.node_count()
+    edge_count = compact.edge_count()
+
+    with open(path, "wb") as f:
+        header = HEADER.pack(MAGIC, VERSION, 0, node_count, edge_count, total)
+        f.write(header + b"\0" * (HEADER_SIZE - len(header)))
+        _write_array(f, name_offsets)
+        f.write(b"".join(encoded))
+        f.write(b"\0" * _padding(total))
+        _write_array(f, array("q", compact.offsets))
+        _write_array(f, array("i", compact.targets))
+        _write_array(f, array("d", compact.resistances))
+
+
+def open_snapshot(path, use_mmap=True):
+    """
+    打开快照文件，返回只读的 CompactGraph
+
+    参数:
+    path -- 快照文件路径
+    use_mmap -- 为 True 时以只读方式内存映射文件（小端机器上零复制）；
+                为 False 时把数组完整读入内存
+
+    返回:
+    CompactGraph；使用 mmap 时可调用其 close() 释放映射
+    """
+    with open(path, "rb") as f:
+        if use_mmap and sys.byteorder == "little":
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+            use_mmap = False
+
+    if len(buffer) < HEADER_SIZE:
+        raise SnapshotError(f"{path} 不是有效的快照文件")
+    magic, version, _flags, node_count, edge_count, names_size = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} 不是有效的快照文件")
+    if version != VERSION:
+        raise SnapshotError(f"不支持的快照版本：{version}")
+
+    # 计算各段位置
+    sections = []
+    position = HEADER_SIZE
+    for size in ((node_count + 1) * 8, names_size, (node_count + 1) * 8, edge_count * 4, edge_count * 8):
+        sections.append((position, position + size))
+        position += size + _padding(size)
+    if position > len(buffer):
+        raise SnapshotError(f"{path} 已被截断")
+
+    view = memoryview(buffer)
+    (name_offsets, names_blob, offsets, targets, resistances) = [
+        view[begin:end] for begin, end in sections
+    ]
+
+    if use_mmap:
+        arrays = (name_offsets.cast("Q"), offsets.cast("q"), targets.cast("i"), resistances.cast("d"))
+    else:
+        arrays = []
+        for data, typecode in ((name_offsets, "Q"), (offsets, "q"), (targets, "i"), (resistances, "d")):
+            values = array(typecode)
+            values.frombytes(data)
+            if sys.byteorder != "little":
+                values.byteswap()
+            arrays.append(values)
+        names_blob = bytes(names_blob)
+    name_offsets, offsets, targets, resistances = arrays
+
+    compact = CompactGraph(NameTable(name_offsets, names_blob), offsets, targets, resistances)
+    if use_mmap:
+        compact._buffer = buffer
+    return compact
+
+
+class NameTable:
+    """
+    按需解码的节点名称序列
+
+    名称只在被访问时解码，打开快照不需要先构建完整的名称列表。
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        offsets = self.offsets
+        blob = self.blob
+        for i in range(len(offsets) - 1):
+            yield bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
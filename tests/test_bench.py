@@ -0,0 +1,34 @@
+import copy
+
+import bench
+
+
+def small_run():
+    return bench.run(generators=["chain"], sizes=[200], repeat=1)
+
+
+def test_identical_results_do_not_regress():
+    current = small_run()
+    assert bench.compare(current, copy.deepcopy(current)) == []
+
+
+def test_inflated_peak_memory_is_a_regression():
+    baseline = small_run()
+    current = copy.deepcopy(baseline)
+    key, entry = next((key, entry) for key, entry in current["results"].items()
+                      if entry["peak_bytes"] >= bench.MEMORY_NOISE_FLOOR)
+    entry["peak_bytes"] *= 3
+    regressions = bench.compare(current, baseline)
+    assert [(k, metric) for k, metric, _, _ in regressions] == [(key, "peak_bytes")]
+    assert bench.compare(current, baseline, max_memory_ratio=4) == []
+
+
+def test_main_fails_on_memory_regression(tmp_path, monkeypatch):
+    baseline = small_run()
+    inflated = copy.deepcopy(baseline)
+    for entry in inflated["results"].values():
+        entry["peak_bytes"] = max(entry["peak_bytes"], bench.MEMORY_NOISE_FLOOR) * 3
+    monkeypatch.setattr(bench, "run", lambda *args, **kwargs: inflated)
+    path = tmp_path / "base.json"
+    path.write_text(bench.json.dumps(baseline), encoding="utf-8")
+    assert bench.main(["--baseline", str(path), "-o", str(tmp_path / "out.json")]) == 1
@@ -0,0 +1,31 @@
+import time
+
+from back import Graph
+from reduction import ReducedGraph
+
+
+def diamond_chain(count):
+    """d0 ⇉ d1 ⇉ … 每一级经 u、l 两条支路，共 2^count 条路径"""
+    edges = []
+    for i in range(count):
+        edges += [(f"d{i}", f"u{i}", 1), (f"d{i}", f"l{i}", 2),
+                  (f"u{i}", f"d{i + 1}", 1), (f"l{i}", f"d{i + 1}", 2)]
+    return Graph.from_edges(edges)
+
+
+def test_first_path_of_long_diamond_chain_is_cheap():
+    reduced = ReducedGraph(diamond_chain(200), keep=["d0", "d200"])
+    begin = time.perf_counter()
+    paths = list(reduced.iter_paths("d0", "d200", max_paths=1))
+    assert time.perf_counter() - begin < 0.5
+    assert len(paths) == 1
+    assert len(paths[0].path) == 401
+
+
+def test_expansion_matches_original_graph():
+    graph = diamond_chain(4)
+    reduced = ReducedGraph(graph, keep=["d0", "d4"])
+    expected = sorted((tuple(p.path), p.resistance) for p in graph.iter_paths("d0", "d4"))
+    actual = sorted((tuple(p.path), p.resistance) for p in reduced.iter_paths("d0", "d4"))
+    assert actual == expected
+    assert reduced.shortest_path("d0", "d4") == graph.shortest_path("d0", "d4")